@@ -0,0 +1,192 @@
+"""
+Batched writes to the ActivityEvent log, off the request path.
+
+record_activity() only puts the event on a bounded in-process queue. A
+background thread writes what is queued with one bulk INSERT per
+ACTIVITY_LOG_BATCH_SIZE events, or once ACTIVITY_LOG_FLUSH_INTERVAL
+seconds have passed since the first queued event. When the queue is full,
+events are dropped and counted rather than slowing requests down.
+
+On PostgreSQL, ActivityEvent is range-partitioned by month. Before each
+batch the recorder creates any missing partitions for the batch's months
+and the next month. Rows land in the default partition only when no
+event was written for a whole month.
+"""
+import atexit
+import datetime
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .models import ActivityEvent
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def month_start(moment):
+    return datetime.date(moment.year, moment.month, 1)
+
+
+def next_month(month):
+    return (month + datetime.timedelta(days=32)).replace(day=1)
+
+
+def partition_name(month):
+    return f'{ActivityEvent._meta.db_table}_p{month:%Y%m}'
+
+
+def create_partitions(months):
+    """Create the monthly partitions starting at each date in ``months``, if missing."""
+    if connection.vendor != 'postgresql':
+        return
+    table = ActivityEvent._meta.db_table
+    with connection.cursor() as cursor:
+        for month in months:
+            try:
+                with transaction.atomic():
+                    cursor.execute(
+                        f'CREATE TABLE IF NOT EXISTS "{partition_name(month)}" PARTITION OF "{table}" '
+                        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+                        f"TO ('{next_month(month).isoformat()} 00:00:00+00')"
+                    )
+            except DatabaseError:
+                # Another process created it first, or the default partition
+                # already holds rows for that month; they stay there.
+                logger.warning("Could not create activity partition", extra={'partition': partition_name(month)})
+
+
+class ActivityRecorder:
+    """Queue of pending ActivityEvents and the thread that writes them."""
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=settings.ACTIVITY_LOG_QUEUE_SIZE)
+        self.lock = threading.Lock()
+        self.thread = None
+        self.dropped = 0
+        self.failed = 0
+        self.partitions = set()
+        atexit.register(self.stop)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def record(self, user_id, action, object_type='', object_id=None, details=None):
+        if self.thread is None and settings.ACTIVITY_LOG_BACKGROUND:
+            self.start()
+        try:
+            self.queue.put_nowait((timezone.now(), user_id, action, object_type, object_id, details or {}))
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='activity-recorder', daemon=True)
+                self.thread.start()
+
+    def stop(self, timeout=5):
+        """Write what is still queued and end the thread; registered with atexit."""
+        thread = self.thread
+        if thread is None:
+            return
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+        self.thread = None
+
+    def _after_fork(self):
+        # The parent's thread did not come along, and the parent writes
+        # whatever it had queued before the fork.
+        self.queue = queue.Queue(maxsize=settings.ACTIVITY_LOG_QUEUE_SIZE)
+        self.lock = threading.Lock()
+        self.thread = None
+        self.dropped = 0
+        self.failed = 0
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = time.monotonic() + settings.ACTIVITY_LOG_FLUSH_INTERVAL
+            while len(batch) < settings.ACTIVITY_LOG_BATCH_SIZE:
+                try:
+                    item = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    break
+                batch.append(item)
+            # Same connection handling as a request: drop connections that
+            # are broken or past CONN_MAX_AGE before and after the write.
+            close_old_connections()
+            try:
+                self.write(batch)
+            finally:
+                close_old_connections()
+            if item is _STOP:
+                return
+
+    def write(self, batch):
+        """INSERT the queued ``batch``; a failed batch is logged and counted, never raised."""
+        months = {next_month(month_start(timezone.now()))}
+        months.update(month_start(occurred_at) for occurred_at, *_ in batch)
+        try:
+            if months - self.partitions:
+                create_partitions(sorted(months - self.partitions))
+                self.partitions |= months
+            with transaction.atomic():
+                ActivityEvent.objects.bulk_create([
+                    ActivityEvent(
+                        occurred_at=occurred_at, user_id=user_id, action=action,
+                        object_type=object_type, object_id=object_id, details=details,
+                    )
+                    for occurred_at, user_id, action, object_type, object_id, details in batch
+                ])
+        except Exception:
+            self.failed += len(batch)
+            logger.exception("Activity events were not written", extra={'events': len(batch)})
+            return 0
+        return len(batch)
+
+    def _drain(self):
+        items = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                return items
+            if item is not _STOP:
+                items.append(item)
+
+    def flush(self):
+        """Write everything queued so far on the calling thread; returns the number of events written."""
+        items = self._drain()
+        size = settings.ACTIVITY_LOG_BATCH_SIZE
+        return sum(self.write(items[start:start + size]) for start in range(0, len(items), size))
+
+    def clear(self):
+        self._drain()
+        self.dropped = 0
+        self.failed = 0
+
+
+activity_recorder = ActivityRecorder()
+
+
+def record_activity(user_id, action, object_type='', object_id=None, details=None):
+    """
+    Queue an ActivityEvent; ``action`` is one of ActivityEvent.ACTION_CHOICES.
+    The event is timestamped now and written shortly after.
+    """
+    activity_recorder.record(user_id, action, object_type, object_id, details)
@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser, Patient, Doctor, PatientDoctorMapping
+from django.utils import timezone
+from .models import CustomUser, Patient, Doctor, PatientDoctorMapping, SystemSettings
+from .cache import invalidate_doctor_directory
 
 @admin.register(CustomUser)
 class CustomUserAdmin(UserAdmin):
@@ -22,24 +24,38 @@ class DoctorAdmin(admin.ModelAdmin):
     list_filter = ('is_approved', 'created_at')
     search_fields = ('full_name', 'email', 'license_number')
     actions = ['approve_doctors', 'reject_doctors']
-    
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        invalidate_doctor_directory()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate_doctor_directory()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        invalidate_doctor_directory()
+
     def approve_doctors(self, request, queryset):
-        updated = queryset.update(is_approved=True)
+        updated = queryset.update(is_approved=True, updated_at=timezone.now())
         # Also activate user accounts
         for doctor in queryset:
             if doctor.user:
                 doctor.user.is_active = True
                 doctor.user.save()
+        invalidate_doctor_directory()
         self.message_user(request, f"{updated} doctors were approved.")
     approve_doctors.short_description = "Approve selected doctors"
     
     def reject_doctors(self, request, queryset):
-        updated = queryset.update(is_approved=False)
+        updated = queryset.update(is_approved=False, updated_at=timezone.now())
         # Also deactivate user accounts
         for doctor in queryset:
             if doctor.user:
                 doctor.user.is_active = False
                 doctor.user.save()
+        invalidate_doctor_directory()
         self.message_user(request, f"{updated} doctors were rejected.")
     reject_doctors.short_description = "Reject selected doctors"
 
@@ -47,3 +63,12 @@ class DoctorAdmin(admin.ModelAdmin):
 class PatientDoctorMappingAdmin(admin.ModelAdmin):
     list_display = ('patient', 'doctor', 'created_at')
     list_filter = ('created_at',)
+
+@admin.register(SystemSettings)
+class SystemSettingsAdmin(admin.ModelAdmin):
+    list_display = ('session_timeout', 'auto_logout', 'max_login_attempts', 'password_min_length', 'updated_at')
+    readonly_fields = ('updated_at', 'updated_by')
+
+    def has_add_permission(self, request):
+        # A single row, created by the first save through the API or here.
+        return not SystemSettings.objects.exists()
@@ -0,0 +1,190 @@
+"""
+Async implementations of the read-heavy endpoints, served when
+``ASYNC_VIEWS`` is enabled (see api/urls.py).
+
+DRF's APIView is synchronous, so under ASGI every request holds a thread
+while it waits on PostgreSQL. These views answer GET natively async,
+with JWT authentication and queries on the async ORM, and produce the
+same payloads as the APIViews in api.views. Writes on the same URLs are
+handed to those APIViews unchanged.
+"""
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .activity import record_activity
+from .authentication import CachedJWTAuthentication, token_claim
+from .cache import adoctor_directory_version, aget_doctor_directory
+from .conditional import conditional_response, make_etag, not_modified, set_validators, user_version
+from .models import Doctor, Patient
+from .pagination import KeysetPagination
+from .premissions import IsOwnerOrAdmin
+from .row_serializers import DoctorRowSerializer, PatientDoctorMappingRowSerializer
+from .serializers import DoctorSerializer, PatientSerializer, UserSerializer
+from .views import (
+    DoctorListCreateView, PatientDetailView, PatientDoctorMappingListCreateView, UserProfileView,
+    doctor_directory_variant, mapping_page_etag, mapping_queryset, parse_doctor_filters,
+)
+
+
+class AsyncReadView(View):
+    """
+    Base for async GET endpoints. ``sync_view`` is the APIView that keeps
+    serving every other method on the URL.
+    """
+    sync_view = None
+    authenticator = CachedJWTAuthentication()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.sync_view is not None:
+            cls.sync_handler = staticmethod(sync_to_async(cls.sync_view.as_view()))
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Authenticated by bearer token like the APIViews, so no CSRF.
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await self.sync_handler(request, *args, **kwargs)
+
+        request = Request(request)
+        try:
+            result = await self.authenticator.aauthenticate(request)
+        except exceptions.APIException as exc:
+            return self.unauthorized(request, exc)
+        if result is None:
+            return self.unauthorized(request, exceptions.NotAuthenticated())
+        request.user, request.auth = result
+        self.request = request
+
+        try:
+            return await self.get(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            detail = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+            return self.render(detail, status=exc.status_code)
+
+    # Every other method goes to sync_view via dispatch(); these exist so
+    # View treats the class as async and does not answer 405 itself.
+    async def post(self, request, *args, **kwargs):
+        return await self.sync_handler(request, *args, **kwargs)
+
+    put = patch = delete = post
+
+    def unauthorized(self, request, exc):
+        detail = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+        response = self.render(detail, status=status.HTTP_401_UNAUTHORIZED)
+        response['WWW-Authenticate'] = self.authenticator.authenticate_header(request)
+        return response
+
+    def render(self, data, status=status.HTTP_200_OK):
+        renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+        return HttpResponse(renderer.render(data), status=status, content_type=renderer.media_type)
+
+
+class AsyncDoctorListView(AsyncReadView):
+    sync_view = DoctorListCreateView
+
+    async def get(self, request):
+        filters, error = parse_doctor_filters(request.query_params)
+        if error:
+            return self.render({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.user.role == 'admin':
+            doctors = Doctor.objects.filter(**filters)
+            summary = await doctors.aaggregate(count=Count('id'), updated_at=Max('updated_at'))
+            etag = make_etag(
+                'doctors', request.get_full_path(), summary['count'], summary['updated_at'],
+                await adoctor_directory_version(),
+            )
+            response = not_modified(request, etag)
+            if response is None:
+                rows = DoctorRowSerializer()
+                response = self.render(rows.serialize([row async for row in rows.values(doctors)]))
+            return set_validators(response, etag)
+
+        async def build():
+            rows = DoctorRowSerializer()
+            doctors = Doctor.objects.filter(is_approved=True, **filters)
+            return rows.serialize([row async for row in rows.values(doctors)])
+
+        variant = doctor_directory_variant(filters)
+        etag = make_etag('doctor-directory', await adoctor_directory_version(), variant)
+        response = not_modified(request, etag)
+        if response is None:
+            response = self.render(await aget_doctor_directory(build, variant=variant))
+        return set_validators(response, etag)
+
+
+class AsyncPatientDetailView(AsyncReadView):
+    sync_view = PatientDetailView
+
+    async def get(self, request, pk):
+        # The user is joined for user_details and the ownership check.
+        patient = await Patient.objects.select_related('user').filter(pk=pk).afirst()
+        if patient is None:
+            return self.render({"error": "Patient not found"}, status=status.HTTP_404_NOT_FOUND)
+        if not IsOwnerOrAdmin().has_object_permission(request, self, patient):
+            raise exceptions.PermissionDenied()
+        record_activity(request.user.id, 'patient.viewed', 'patient', patient.pk)
+        return conditional_response(
+            request,
+            lambda: self.render(PatientSerializer(patient).data),
+            etag=make_etag('patient', patient.pk, patient.updated_at, user_version(patient.user)),
+        )
+
+
+class AsyncMappingListView(AsyncReadView):
+    sync_view = PatientDoctorMappingListCreateView
+
+    async def get(self, request):
+        mappings = mapping_queryset()
+        if request.user.role == 'doctor':
+            mappings = mappings.filter(doctor__user=request.user)
+        elif request.user.role != 'admin':
+            mappings = mappings.filter(patient__user=request.user)
+
+        paginator = KeysetPagination(ordering=('-created_at', '-id'))
+        page_qs = paginator.get_page_queryset(mappings, request)
+        page = paginator.build_page([row async for row in page_qs])
+        return conditional_response(
+            request,
+            lambda: self.render(paginator.get_paginated_data(
+                PatientDoctorMappingRowSerializer().serialize(page)
+            )),
+            etag=mapping_page_etag(request, paginator, page),
+        )
+
+
+class AsyncUserProfileView(AsyncReadView):
+    sync_view = UserProfileView
+
+    async def get(self, request):
+        user_data = UserSerializer(request.user).data
+
+        profile_id = token_claim(request, 'profile_id')
+        if request.user.role == 'patient':
+            patients = Patient.objects.filter(user=request.user)
+            if profile_id:
+                patients = patients.filter(pk=profile_id)
+            patient = await patients.afirst()
+            if patient:
+                patient.user = request.user
+            user_data['profile'] = PatientSerializer(patient).data if patient else None
+        elif request.user.role == 'doctor':
+            doctors = Doctor.objects.filter(user=request.user).select_related('created_by')
+            if profile_id:
+                doctors = doctors.filter(pk=profile_id)
+            doctor = await doctors.afirst()
+            user_data['profile'] = DoctorSerializer(doctor).data if doctor else None
+        else:
+            user_data['profile'] = None
+
+        return self.render(user_data)
@@ -0,0 +1,268 @@
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch, get_md5_hash_password
+
+from .models import CustomUser, Doctor, Patient
+from .system_settings import (
+    access_token_lifetime, aget_system_settings, get_system_settings, refresh_token_lifetime,
+)
+
+
+class HealthcareAccessToken(AccessToken):
+    """Access token whose lifetime is capped by SystemSettings.session_timeout."""
+
+    @property
+    def lifetime(self):
+        return access_token_lifetime()
+
+
+class HealthcareRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the principal's ``role`` and ``profile_id``
+    claims. Access tokens minted from it (including on refresh) copy the
+    claims, so views can read them from ``request.auth`` without looking
+    the profile up. Doctor approval is not a claim: it can change during
+    the token's lifetime, and approval toggles ``user.is_active``, which
+    authentication checks on every request.
+
+    Lifetimes follow SystemSettings: see access_token_lifetime() and
+    refresh_token_lifetime().
+    """
+    access_token_class = HealthcareAccessToken
+
+    @property
+    def lifetime(self):
+        return refresh_token_lifetime()
+
+    @classmethod
+    def for_user(cls, user, profile_id=None):
+        token = super().for_user(user)
+        if profile_id is None:
+            if user.role == 'doctor':
+                profile_id = Doctor.objects.filter(user=user).values_list('id', flat=True).first()
+            elif user.role == 'patient':
+                profile_id = Patient.objects.filter(user=user).values_list('id', flat=True).first()
+        token['role'] = user.role
+        token['profile_id'] = profile_id
+        return token
+
+
+class HealthcareTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Token refresh (SIMPLE_JWT's TOKEN_REFRESH_SERIALIZER) under the
+    SystemSettings session policy. With auto_logout every refresh also
+    returns a new refresh token valid for session_timeout, so a session
+    ends once it has been idle that long.
+    """
+    token_class = HealthcareRefreshToken
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        if 'refresh' not in data and get_system_settings()['auto_logout']:
+            refresh = self.token_class(attrs['refresh'])
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        return data
+
+
+def token_claim(request, name):
+    """Read a claim from the request's access token, or None (e.g. session auth)."""
+    token = getattr(request, 'auth', None)
+    if token is None or not hasattr(token, 'get'):
+        return None
+    return token.get(name)
+
+
+PRINCIPAL_CACHE_VERSION_KEY = 'auth-principal:version'
+
+
+class PrincipalCache:
+    """
+    Small process-local LRU of authenticated users with a short TTL.
+
+    Entries hold plain field values; every hit builds a fresh CustomUser so
+    one request cannot mutate another request's ``request.user``. User
+    saves and deletes drop the entry in this process and, once the
+    transaction commits, bump a version key in the shared cache (see
+    api.signals). Each process compares that key at most every
+    AUTH_PRINCIPAL_CACHE_CHECK_INTERVAL seconds and empties itself when it
+    has moved, the same scheme as api.system_settings.
+    """
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._field_names = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def _shared_version(self):
+        try:
+            version = cache.get(PRINCIPAL_CACHE_VERSION_KEY)
+            if version is None:
+                cache.add(PRINCIPAL_CACHE_VERSION_KEY, time.time_ns() // 1000, timeout=None)
+                version = cache.get(PRINCIPAL_CACHE_VERSION_KEY)
+            return version
+        except Exception:
+            # Without the shared cache, entries last one check interval.
+            return None
+
+    def needs_check(self):
+        return time.monotonic() - self._checked_at >= settings.AUTH_PRINCIPAL_CACHE_CHECK_INTERVAL
+
+    def check_version(self):
+        """Empty the cache if a user was changed in any process since the last check."""
+        version = self._shared_version()
+        with self._lock:
+            if version is None or version != self._version:
+                self._entries.clear()
+            self._version = version
+            self._checked_at = time.monotonic()
+
+    def _names(self):
+        if self._field_names is None:
+            self._field_names = [field.attname for field in CustomUser._meta.concrete_fields]
+        return self._field_names
+
+    def get(self, user_id):
+        if self.needs_check():
+            self.check_version()
+        user_id = str(user_id)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, values = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        return CustomUser.from_db('default', self._names(), values)
+
+    def set(self, user):
+        values = [getattr(user, name) for name in self._names()]
+        key = str(user.pk)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+        transaction.on_commit(self._bump_version, robust=True)
+
+    def _bump_version(self):
+        try:
+            cache.incr(PRINCIPAL_CACHE_VERSION_KEY)
+        except ValueError:
+            self._shared_version()
+        except Exception:
+            pass
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+            self._checked_at = 0.0
+
+
+principal_cache = PrincipalCache(
+    ttl=settings.AUTH_PRINCIPAL_CACHE_TTL,
+    max_entries=settings.AUTH_PRINCIPAL_CACHE_SIZE,
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the user from ``principal_cache`` and
+    only queries the database on a miss.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        self.check_session_timeout(validated_token, access_token_lifetime())
+        return validated_token
+
+    def check_session_timeout(self, validated_token, lifetime):
+        # session_timeout can be lowered at runtime: tokens issued under a
+        # longer one stop working now instead of at their own expiry.
+        issued_at = validated_token.get('iat')
+        if issued_at is not None and datetime_from_epoch(issued_at) + lifetime < validated_token.current_time:
+            raise InvalidToken("Token is expired")
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            return super().get_user(validated_token)
+
+        user = principal_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            principal_cache.set(user)
+            return user
+        self.check_user(user, validated_token)
+        return user
+
+    def check_user(self, user, validated_token):
+        # Same checks JWTAuthentication.get_user applies to a fresh user.
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed("The user's password has been changed.", code="password_changed")
+
+    async def aauthenticate(self, request):
+        """
+        Async counterpart of ``authenticate`` for the views in api.async_views.
+        Token validation is CPU only; a cache miss loads the user with the
+        async ORM, and stale SystemSettings are reloaded in a worker thread.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = super().get_validated_token(raw_token)
+        self.check_session_timeout(validated_token, access_token_lifetime(await aget_system_settings()))
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        if principal_cache.needs_check():
+            await sync_to_async(principal_cache.check_version)()
+        user = principal_cache.get(user_id)
+        if user is None:
+            try:
+                user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed("User not found", code="user_not_found")
+            self.check_user(user, validated_token)
+            principal_cache.set(user)
+            return user
+        self.check_user(user, validated_token)
+        return user
@@ -0,0 +1,69 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+DOCTOR_DIRECTORY_VERSION_KEY = 'doctor-directory:version'
+
+
+def doctor_directory_version():
+    """Current directory version; changes on every invalidation."""
+    version = cache.get(DOCTOR_DIRECTORY_VERSION_KEY)
+    if version is None:
+        # Seed from the clock rather than 1 so that an evicted version key
+        # can never roll back onto entries cached under an older version.
+        cache.add(DOCTOR_DIRECTORY_VERSION_KEY, time.time_ns() // 1000, timeout=None)
+        version = cache.get(DOCTOR_DIRECTORY_VERSION_KEY)
+    return version
+
+
+def get_doctor_directory(build, variant=''):
+    """
+    Read-through cache for the serialized approved-doctor directory.
+
+    ``build`` is called on a miss and must return the serialized payload.
+    ``variant`` distinguishes differently filtered views of the directory;
+    all variants are invalidated together by invalidate_doctor_directory().
+    """
+    key = f'doctor-directory:{doctor_directory_version()}:{variant}'
+    payload = cache.get(key)
+    if payload is None:
+        payload = build()
+        cache.set(key, payload, timeout=settings.DOCTOR_DIRECTORY_CACHE_TIMEOUT)
+    return payload
+
+
+async def adoctor_directory_version():
+    version = await cache.aget(DOCTOR_DIRECTORY_VERSION_KEY)
+    if version is None:
+        await cache.aadd(DOCTOR_DIRECTORY_VERSION_KEY, time.time_ns() // 1000, timeout=None)
+        version = await cache.aget(DOCTOR_DIRECTORY_VERSION_KEY)
+    return version
+
+
+async def aget_doctor_directory(build, variant=''):
+    """Async get_doctor_directory(); ``build`` is a coroutine function."""
+    key = f'doctor-directory:{await adoctor_directory_version()}:{variant}'
+    payload = await cache.aget(key)
+    if payload is None:
+        payload = await build()
+        await cache.aset(key, payload, timeout=settings.DOCTOR_DIRECTORY_CACHE_TIMEOUT)
+    return payload
+
+
+def bump_doctor_directory_version():
+    try:
+        cache.incr(DOCTOR_DIRECTORY_VERSION_KEY)
+    except ValueError:
+        # No version yet: nothing cached under the current one either.
+        doctor_directory_version()
+
+
+def invalidate_doctor_directory():
+    """
+    Call whenever a doctor is created, updated, deleted, approved or rejected.
+    The version moves once the transaction commits; bumping earlier would let
+    a concurrent read cache the old rows under the new version.
+    """
+    transaction.on_commit(bump_doctor_directory_version, robust=True)
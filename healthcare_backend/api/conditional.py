@@ -0,0 +1,59 @@
+"""
+Conditional GET helpers: ETag/Last-Modified validators and 304 responses.
+
+Validators are built from ``updated_at`` columns and cache versions that
+the views already have in hand, so a matching request skips
+serialization and goes out as an empty 304.
+
+The views only send ETags. A Last-Modified built from ``updated_at``
+misses deleted rows and edits to embedded users, so If-Modified-Since
+would answer 304 for changed data; pass ``last_modified`` only when one
+timestamp covers every input to the response.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    """Weak ETag over ``parts``; equal parts mean an equivalent payload."""
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"'
+
+
+def user_version(user):
+    """The user fields UserSerializer outputs, for resources embedding a user."""
+    if user is None:
+        return None
+    return (user.pk, user.username, user.email, user.first_name, user.last_name, user.role, user.is_active)
+
+
+def not_modified(request, etag=None, last_modified=None):
+    """Return a 304 response if the request's validators match, else None."""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag=None, last_modified=None):
+    if etag:
+        response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Per-user data: never stored by shared caches, always revalidated.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_response(request, build, etag=None, last_modified=None):
+    """
+    304 when the client's copy is current, otherwise ``build()``'s
+    response. Either way the validators are attached.
+    """
+    response = not_modified(request, etag, last_modified)
+    if response is None:
+        response = set_validators(build(), etag, last_modified)
+    return response
@@ -0,0 +1,87 @@
+import csv
+import json
+
+from rest_framework import serializers
+
+# Output column name -> ORM path passed to values_list().
+PATIENT_EXPORT_COLUMNS = {
+    'id': 'id',
+    'user': 'user_id',
+    'full_name': 'full_name',
+    'email': 'email',
+    'age': 'age',
+    'gender': 'gender',
+    'contact_number': 'contact_number',
+    'medical_history': 'medical_history',
+    'created_at': 'created_at',
+}
+
+MAPPING_EXPORT_COLUMNS = {
+    'id': 'id',
+    'patient': 'patient_id',
+    'patient_name': 'patient__full_name',
+    'doctor': 'doctor_id',
+    'doctor_name': 'doctor__full_name',
+    'doctor_specializations': 'doctor__specializations',
+    'created_at': 'created_at',
+}
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+_datetime_field = serializers.DateTimeField()
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def _to_text(value):
+    if hasattr(value, 'isoformat'):
+        # Same representation as the JSON API (e.g. 2025-01-01T10:00:00Z).
+        return _datetime_field.to_representation(value)
+    return value
+
+
+def stream_export(queryset, columns, file_format, chunk_size=2000):
+    """
+    Yield the export as encoded chunks, one row at a time.
+
+    ``columns`` maps output names to ORM paths. Rows are read with
+    ``values_list().iterator()``, which uses a server-side cursor on
+    PostgreSQL, so memory stays flat however large the table is.
+    """
+    rows = queryset.values_list(*columns.values()).iterator(chunk_size=chunk_size)
+    names = list(columns)
+
+    if file_format == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(names).encode()
+        for row in rows:
+            yield writer.writerow([
+                json.dumps(value) if isinstance(value, (list, dict)) else _to_text(value)
+                for value in row
+            ]).encode()
+    else:
+        for row in rows:
+            record = {name: _to_text(value) for name, value in zip(names, row)}
+            yield (json.dumps(record) + '\n').encode()
+
+
+def parse_columns(requested, available):
+    """
+    Resolve a comma-separated ``columns=`` value against the available
+    columns. Returns ``(columns, error)``.
+    """
+    if not requested:
+        return dict(available), None
+    names = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        return None, f"Unknown columns: {', '.join(unknown)}"
+    return {name: available[name] for name in names}, None
@@ -0,0 +1,210 @@
+import codecs
+import csv
+import io
+import json
+
+from django.db import connection, transaction
+from rest_framework import serializers
+
+from .models import CustomUser, Patient
+from .serializers import PatientSerializer
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def detect_format(filename, file_format=None):
+    """Resolve the upload format from an explicit value or the file extension."""
+    if file_format:
+        file_format = file_format.lower()
+    elif filename:
+        extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+        file_format = {'csv': 'csv', 'ndjson': 'ndjson', 'jsonl': 'ndjson'}.get(extension)
+    if file_format not in ('csv', 'ndjson'):
+        raise ImportFormatError("file_format must be 'csv' or 'ndjson'")
+    return file_format
+
+
+def iter_text_lines(stream, encoding='utf-8-sig'):
+    """Decode a binary line iterator (an upload or an open file) lazily."""
+    return codecs.iterdecode(stream, encoding)
+
+
+def check_encoding(stream, encoding='utf-8-sig', chunk_size=64 * 1024):
+    """
+    Decode all of a seekable binary ``stream``, then rewind it. Rows are
+    committed chunk by chunk, so a bad byte must be found before the first
+    INSERT; raises ImportFormatError naming the line it is on.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    line = 1
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        pending = len(decoder.getstate()[0])
+        try:
+            decoder.decode(chunk)
+        except UnicodeDecodeError as exc:
+            line += chunk[:max(exc.start - pending, 0)].count(b'\n')
+            raise ImportFormatError(f"File must be UTF-8 encoded (invalid bytes on line {line}).") from exc
+        line += chunk.count(b'\n')
+    try:
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError as exc:
+        raise ImportFormatError(f"File must be UTF-8 encoded (invalid bytes on line {line}).") from exc
+    stream.seek(0)
+
+
+def iter_rows(lines, file_format):
+    """
+    Yield ``(row_number, row)`` pairs without reading the whole input.
+
+    ``row`` is a dict for well-formed input, or an error message string.
+    Blank CSV cells are dropped so model defaults apply, the same as a
+    field omitted from a JSON request.
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(lines)
+        for row_number, row in enumerate(reader, start=1):
+            if None in row:
+                yield row_number, 'Row has more values than the header.'
+                continue
+            yield row_number, {key: value for key, value in row.items() if value != ''}
+    else:
+        row_number = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield row_number, 'Invalid JSON.'
+                continue
+            if not isinstance(row, dict):
+                yield row_number, 'Each line must be a JSON object.'
+                continue
+            yield row_number, row
+
+
+class PatientImporter:
+    """
+    Validate and insert patients in fixed-size chunks.
+
+    Rows are checked with the PatientSerializer rules (age, gender,
+    contact_number, ...) and written with ``bulk_create`` or, on
+    PostgreSQL, ``COPY``. Only one chunk is held in memory at a time, and
+    at most ``max_errors`` row errors are kept for the report.
+
+    A row may carry a ``user`` id; otherwise the patient is owned by
+    ``default_user``.
+    """
+
+    METHODS = ('bulk_create', 'copy')
+
+    def __init__(self, default_user, chunk_size=1000, method='bulk_create', max_errors=1000):
+        if method not in self.METHODS:
+            raise ValueError(f"method must be one of: {', '.join(self.METHODS)}")
+        if method == 'copy' and connection.vendor != 'postgresql':
+            raise ValueError('COPY ingestion needs a PostgreSQL database.')
+        self.default_user = default_user
+        self.chunk_size = chunk_size
+        self.method = method
+        self.max_errors = max_errors
+        # One serializer instance validates every row, so DRF builds its
+        # field objects once instead of once per row.
+        self.serializer = PatientSerializer()
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def run(self, rows):
+        chunk = []
+        for row_number, row in rows:
+            chunk.append((row_number, row))
+            if len(chunk) >= self.chunk_size:
+                self.import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self.import_chunk(chunk)
+        return self.report()
+
+    def report(self):
+        return {
+            'created': self.created,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+    def add_error(self, row_number, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': row_number, 'errors': errors})
+
+    def import_chunk(self, chunk):
+        requested_users = set()
+        for _, row in chunk:
+            if isinstance(row, dict) and row.get('user') not in (None, ''):
+                requested_users.add(str(row['user']))
+        known_users = set()
+        numeric_ids = [user_id for user_id in requested_users if user_id.isdigit()]
+        if numeric_ids:
+            known_users = {
+                str(pk) for pk in CustomUser.objects.filter(pk__in=numeric_ids).values_list('pk', flat=True)
+            }
+
+        patients = []
+        for row_number, row in chunk:
+            if not isinstance(row, dict):
+                self.add_error(row_number, {'non_field_errors': [row]})
+                continue
+            user_id = row.get('user')
+            if user_id not in (None, '') and str(user_id) not in known_users:
+                self.add_error(row_number, {'user': [f'User {user_id} does not exist.']})
+                continue
+            try:
+                validated = self.serializer.run_validation(row)
+            except serializers.ValidationError as exc:
+                self.add_error(row_number, exc.detail)
+                continue
+            if user_id in (None, ''):
+                patients.append(Patient(user=self.default_user, **validated))
+            else:
+                patients.append(Patient(user_id=int(user_id), **validated))
+
+        if not patients:
+            return
+        with transaction.atomic():
+            if self.method == 'copy':
+                self.copy_patients(patients)
+            else:
+                Patient.objects.bulk_create(patients)
+        self.created += len(patients)
+
+    def copy_patients(self, patients):
+        fields = [field for field in Patient._meta.concrete_fields if not field.primary_key]
+        columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+        buffer = io.StringIO()
+        for patient in patients:
+            values = []
+            for field in fields:
+                # pre_save fills auto_now/auto_now_add columns like save() does.
+                value = field.get_db_prep_save(field.pre_save(patient, add=True), connection)
+                values.append(_copy_csv_value(value))
+            buffer.write(','.join(values) + '\n')
+        buffer.seek(0)
+
+        sql = f"COPY {connection.ops.quote_name(Patient._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        with connection.cursor() as cursor:
+            if hasattr(cursor, 'copy_expert'):  # psycopg2
+                cursor.copy_expert(sql, buffer)
+            else:  # psycopg3
+                with cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+
+def _copy_csv_value(value):
+    # Quote every non-NULL value so empty strings stay distinct from NULL.
+    if value is None:
+        return '\\N'
+    return '"' + str(value).replace('"', '""') + '"'
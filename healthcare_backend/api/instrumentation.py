@@ -0,0 +1,304 @@
+"""
+Per-endpoint request instrumentation.
+
+RequestMetricsMiddleware samples METRICS_SAMPLE_RATE of the requests. For
+each sampled request it records, keyed by URL name and method:
+
+- total latency
+- the number of SQL queries
+- time spent in the database
+- time spent serializing
+
+An unsampled request costs one random() call plus a context variable
+lookup per query and per serializer.
+
+Each process keeps the numbers as histograms and publishes them to the
+shared cache every METRICS_PUBLISH_INTERVAL seconds. collect_request_metrics()
+merges every process's copy, so the admin endpoint covers all workers.
+"""
+import contextvars
+import functools
+import os
+import random
+import socket
+import threading
+import time
+from bisect import bisect_left
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+METRICS_PREFIX = 'request-metrics'
+PROCESS_INDEX_KEY = f'{METRICS_PREFIX}:processes'
+SNAPSHOT_TIMEOUT = 24 * 3600
+
+# Upper bounds of the histogram buckets; a final +Inf bucket is implied.
+TIME_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+HISTOGRAMS = {
+    'latency_ms': TIME_BUCKETS_MS,
+    'db_ms': TIME_BUCKETS_MS,
+    'serializer_ms': TIME_BUCKETS_MS,
+    'queries': (0, 1, 2, 3, 5, 10, 20, 50, 100),
+}
+
+_sample = contextvars.ContextVar('request_metrics_sample', default=None)
+
+
+class RequestSample:
+    """What one sampled request spent, filled in while it runs."""
+    __slots__ = ('queries', 'db_time', 'serializer_time', 'serializing')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    sample = _sample.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample.queries += 1
+        sample.db_time += time.perf_counter() - start
+
+
+def timed_serialization(func):
+    """
+    Count the time spent in ``func`` as serializer time for the current
+    sampled request. Nested serializers are not counted twice, and
+    queries run while serializing (lazy querysets) count as DB time only.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        sample = _sample.get()
+        if sample is None or sample.serializing:
+            return func(*args, **kwargs)
+        sample.serializing = True
+        db_time = sample.db_time
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            sample.serializing = False
+            sample.serializer_time += time.perf_counter() - start - (sample.db_time - db_time)
+    return wrapper
+
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds, counts=None, total=0, count=0):
+        self.bounds = bounds
+        self.counts = list(counts) if counts else [0] * (len(bounds) + 1)
+        self.sum = total
+        self.count = count
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other['counts'])]
+        self.sum += other['sum']
+        self.count += other['count']
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (None for +Inf)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def as_dict(self):
+        return {'counts': self.counts, 'sum': self.sum, 'count': self.count}
+
+    def summary(self):
+        """Report form: cumulative ``[upper_bound, count]`` buckets plus quantile estimates."""
+        buckets, seen = [], 0
+        for bound, count in zip((*self.bounds, '+Inf'), self.counts):
+            seen += count
+            buckets.append([bound, seen])
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 3),
+            'mean': round(self.sum / self.count, 3) if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': buckets,
+        }
+
+
+class RequestMetrics:
+    """Histograms for the requests this process has sampled."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+        self.published_at = 0.0
+
+    def observe(self, endpoint, method, sample, latency):
+        values = {
+            'latency_ms': latency * 1000,
+            'db_ms': sample.db_time * 1000,
+            'serializer_ms': sample.serializer_time * 1000,
+            'queries': sample.queries,
+        }
+        with self.lock:
+            histograms = self.endpoints.get((endpoint, method))
+            if histograms is None:
+                histograms = self.endpoints[(endpoint, method)] = {
+                    name: Histogram(bounds) for name, bounds in HISTOGRAMS.items()
+                }
+            for name, value in values.items():
+                histograms[name].observe(value)
+        if time.monotonic() - self.published_at >= settings.METRICS_PUBLISH_INTERVAL:
+            self.publish()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                f'{endpoint} {method}': {name: h.as_dict() for name, h in histograms.items()}
+                for (endpoint, method), histograms in self.endpoints.items()
+            }
+
+    def publish(self):
+        self.published_at = time.monotonic()
+        key = f'{METRICS_PREFIX}:process:{socket.gethostname()}:{os.getpid()}'
+        # Metrics must never fail a request, e.g. when Redis is briefly away.
+        try:
+            cache.set(key, self.snapshot(), timeout=SNAPSHOT_TIMEOUT)
+            processes = cache.get(PROCESS_INDEX_KEY) or []
+            if key not in processes:
+                cache.set(PROCESS_INDEX_KEY, [*processes, key], timeout=None)
+        except Exception:
+            pass
+
+    def reset(self):
+        with self.lock:
+            self.endpoints.clear()
+        self.published_at = 0.0
+
+
+request_metrics = RequestMetrics()
+
+
+def collect_request_metrics():
+    """
+    Merge every process's published histograms into
+    ``{(endpoint, method): {histogram_name: Histogram}}``.
+    """
+    request_metrics.publish()
+    processes = cache.get(PROCESS_INDEX_KEY) or []
+    snapshots = cache.get_many(processes)
+    if len(snapshots) < len(processes):
+        # Drop processes whose snapshot expired; live ones re-add themselves.
+        cache.set(PROCESS_INDEX_KEY, [key for key in processes if key in snapshots], timeout=None)
+
+    merged = {}
+    for snapshot in snapshots.values():
+        for label, histograms in snapshot.items():
+            endpoint, method = label.rsplit(' ', 1)
+            target = merged.setdefault((endpoint, method), {
+                name: Histogram(bounds) for name, bounds in HISTOGRAMS.items()
+            })
+            for name, histogram in histograms.items():
+                target[name].merge(histogram)
+    return dict(sorted(merged.items()))
+
+
+def request_metrics_report():
+    """One entry per endpoint and method, slowest mean latency first."""
+    report = []
+    for (endpoint, method), histograms in collect_request_metrics().items():
+        entry = {'endpoint': endpoint, 'method': method}
+        entry.update((name, histogram.summary()) for name, histogram in histograms.items())
+        report.append(entry)
+    report.sort(key=lambda entry: -(entry['latency_ms']['mean'] or 0))
+    return report
+
+
+def endpoint_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None and match.view_name else '<unresolved>'
+
+
+class RequestMetricsMiddleware:
+    """
+    Samples requests into request_metrics. Latency runs until the
+    response is returned, so a streaming body's generation is not included.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if random.random() >= settings.METRICS_SAMPLE_RATE:
+            return self.get_response(request)
+        sample = RequestSample()
+        token = _sample.set(sample)
+        start = time.perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            _sample.reset(token)
+            request_metrics.observe(endpoint_name(request), request.method, sample, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        if random.random() >= settings.METRICS_SAMPLE_RATE:
+            return await self.get_response(request)
+        sample = RequestSample()
+        token = _sample.set(sample)
+        start = time.perf_counter()
+        try:
+            return await self.get_response(request)
+        finally:
+            _sample.reset(token)
+            request_metrics.observe(endpoint_name(request), request.method, sample, time.perf_counter() - start)
+
+
+def _install_execute_wrapper(connection, **kwargs):
+    if db_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(db_execute_wrapper)
+
+
+def install():
+    """
+    Hook the DB and serializer timers in; called from ApiConfig.ready().
+
+    The DB wrapper goes on every connection rather than around each
+    request. The async views run their queries on other threads'
+    connections, and the sample reaches them through the context variable.
+    """
+    from rest_framework.serializers import BaseSerializer
+
+    connection_created.connect(_install_execute_wrapper, dispatch_uid='api.instrumentation')
+    for connection in connections.all(initialized_only=True):
+        _install_execute_wrapper(connection)
+
+    data = BaseSerializer.data
+    if not getattr(data.fget, 'timed', False):
+        # Serializer.data and ListSerializer.data both end up here exactly once.
+        fget = timed_serialization(data.fget)
+        fget.timed = True
+        BaseSerializer.data = property(fget)
@@ -0,0 +1,94 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+from api.models import CustomUser
+
+
+class Command(BaseCommand):
+    """Compare request throughput with and without database connection reuse"""
+
+    help = (
+        "Simulate request cycles against PostgreSQL for each DB_POOL_MODE and "
+        "report requests per second. Run it against a local database."
+    )
+
+    MODES = ('none', 'persistent', 'pool')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per mode')
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent worker threads')
+        parser.add_argument('--modes', nargs='+', choices=self.MODES, default=list(self.MODES))
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor != 'postgresql':
+            raise CommandError('This benchmark needs a PostgreSQL database.')
+
+        settings_dict = connections.settings['default']
+        original = {
+            'CONN_MAX_AGE': settings_dict.get('CONN_MAX_AGE', 0),
+            'CONN_HEALTH_CHECKS': settings_dict.get('CONN_HEALTH_CHECKS', False),
+            'OPTIONS': dict(settings_dict.get('OPTIONS', {})),
+        }
+
+        self.stdout.write(f"{'mode':<12}{'requests':>10}{'seconds':>10}{'req/s':>10}")
+        try:
+            for mode in options['modes']:
+                try:
+                    self.configure(settings_dict, mode)
+                except ImportError as exc:
+                    self.stdout.write(f"{mode:<12}skipped ({exc})")
+                    continue
+                elapsed = self.run(options['requests'], options['threads'])
+                rps = options['requests'] / elapsed
+                self.stdout.write(f"{mode:<12}{options['requests']:>10}{elapsed:>10.2f}{rps:>10.0f}")
+                self.reset()
+        finally:
+            settings_dict.update(original)
+
+    def configure(self, settings_dict, mode):
+        options = dict(settings_dict.get('OPTIONS', {}))
+        options.pop('pool', None)
+        settings_dict['CONN_HEALTH_CHECKS'] = False
+        if mode == 'none':
+            settings_dict['CONN_MAX_AGE'] = 0
+        elif mode == 'persistent':
+            settings_dict['CONN_MAX_AGE'] = 600
+            settings_dict['CONN_HEALTH_CHECKS'] = True
+        else:
+            import psycopg_pool  # noqa: F401  pooling needs psycopg3
+            settings_dict['CONN_MAX_AGE'] = 0
+            options['pool'] = {'min_size': 1, 'max_size': 32}
+        settings_dict['OPTIONS'] = options
+
+    def reset(self):
+        connections.close_all()
+        connection = connections['default']
+        if hasattr(connection, 'close_pool'):
+            connection.close_pool()
+
+    def run(self, total, threads):
+        per_thread = [total // threads + (1 if i < total % threads else 0) for i in range(threads)]
+        barrier = threading.Barrier(threads + 1)
+
+        def worker(count):
+            barrier.wait()
+            for _ in range(count):
+                # The same signals Django sends around every real request;
+                # close_old_connections() is what honours CONN_MAX_AGE.
+                request_started.send(sender=self.__class__)
+                CustomUser.objects.filter(pk=1).exists()
+                request_finished.send(sender=self.__class__)
+            connections.close_all()
+
+        workers = [threading.Thread(target=worker, args=(count,)) for count in per_thread]
+        for thread in workers:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in workers:
+            thread.join()
+        return time.perf_counter() - start
@@ -0,0 +1,83 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.models import Doctor
+
+
+class RollbackBenchmark(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """Measure specialization/experience filter latency on a large doctor table"""
+
+    help = (
+        "Seed doctors inside a transaction, time the directory filter with and "
+        "without index scans, then roll everything back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--doctors', type=int, default=100_000)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('This benchmark needs a PostgreSQL database.')
+
+        try:
+            with transaction.atomic():
+                self.seed(options['doctors'], options['batch_size'])
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE api_doctor')
+
+                self.stdout.write(f"{'plan':<10}{'p50 ms':>10}{'p95 ms':>10}{'rows':>10}")
+                self.report('indexed', options['queries'])
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_indexscan = off')
+                    cursor.execute('SET LOCAL enable_bitmapscan = off')
+                self.report('seqscan', options['queries'])
+                raise RollbackBenchmark
+        except RollbackBenchmark:
+            pass
+
+    def seed(self, total, batch_size):
+        choices = [choice for choice, _ in Doctor.SPECIALIZATION_CHOICES]
+        rng = random.Random(42)
+        for start in range(0, total, batch_size):
+            Doctor.objects.bulk_create([
+                Doctor(
+                    full_name=f'Bench Doctor {i}',
+                    email=f'bench-doctor-{i}@example.com',
+                    specializations=rng.sample(choices, rng.randint(1, 3)),
+                    years_of_experience=rng.randint(0, 40),
+                    is_approved=rng.random() < 0.9,
+                )
+                for i in range(start, min(start + batch_size, total))
+            ])
+        self.stdout.write(f'Seeded {total} doctors')
+
+    def queryset(self, specialization, min_experience):
+        return Doctor.objects.filter(
+            is_approved=True,
+            specializations__contains=[specialization],
+            years_of_experience__gte=min_experience,
+        ).values_list('id', flat=True)
+
+    def report(self, label, queries):
+        choices = [choice for choice, _ in Doctor.SPECIALIZATION_CHOICES]
+        rng = random.Random(7)
+        timings = []
+        rows = 0
+        for _ in range(queries):
+            qs = self.queryset(rng.choice(choices), rng.randint(0, 40))
+            start = time.perf_counter()
+            rows += len(list(qs))
+            timings.append((time.perf_counter() - start) * 1000)
+        p95 = statistics.quantiles(timings, n=20)[-1]
+        self.stdout.write(f"{label:<10}{statistics.median(timings):>10.2f}{p95:>10.2f}{rows // queries:>10}")
+        self.stdout.write(self.queryset('Cardiology', 25).explain())
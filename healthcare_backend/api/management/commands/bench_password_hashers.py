@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+    """Measure password verifications per second on one core for each hasher"""
+
+    help = (
+        "Hash a password once with each configured hasher, then verify it "
+        "repeatedly on a single thread. Verifications per second is the login "
+        "capacity of one core spent on hashing alone."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hashers', nargs='+', choices=list(settings.PASSWORD_HASHER_CHOICES),
+            default=list(settings.PASSWORD_HASHER_CHOICES),
+        )
+        parser.add_argument('--seconds', type=float, default=3.0, help='Time budget per hasher')
+
+    def handle(self, *args, **options):
+        password = 'Bench-pass-9471'
+        self.stdout.write(f"{'hasher':<10}{'verifies':>10}{'ms/login':>10}{'logins/s/core':>15}")
+        for name in options['hashers']:
+            try:
+                hasher = import_string(settings.PASSWORD_HASHER_CHOICES[name])()
+                encoded = hasher.encode(password, hasher.salt())
+            except ValueError as exc:
+                # Raised when the hasher's library (argon2-cffi, bcrypt) is missing.
+                self.stdout.write(f"{name:<10}skipped ({exc})")
+                continue
+
+            count = 0
+            start = time.perf_counter()
+            deadline = start + options['seconds']
+            while True:
+                hasher.verify(password, encoded)
+                count += 1
+                if time.perf_counter() >= deadline:
+                    break
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{name:<10}{count:>10}{elapsed / count * 1000:>10.1f}{count / elapsed:>15.1f}"
+            )
+
@@ -0,0 +1,77 @@
+import datetime
+import gzip
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import ORJSONRenderer
+
+
+class Command(BaseCommand):
+    """Measure JSON encoding time and compressed size for a large list payload"""
+
+    help = (
+        "Render an N-row patient list with the stdlib and orjson renderers, "
+        "then report bytes on the wire and time for identity, gzip and brotli."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement; the best is reported')
+
+    def handle(self, *args, **options):
+        rows = self.payload(options['rows'])
+        repeat = options['repeat']
+
+        self.stdout.write(f"{'step':<22}{'ms':>10}{'bytes':>12}")
+        body = None
+        for name, renderer in (('render json', JSONRenderer()), ('render orjson', ORJSONRenderer())):
+            elapsed, body = self.best(lambda: renderer.render(rows), repeat)
+            self.stdout.write(f"{name:<22}{elapsed * 1000:>10.1f}{len(body):>12}")
+
+        elapsed, compressed = self.best(
+            lambda: gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0), repeat
+        )
+        self.stdout.write(f"{'gzip':<22}{elapsed * 1000:>10.1f}{len(compressed):>12}")
+        try:
+            import brotli
+        except ImportError:
+            self.stdout.write(f"{'brotli':<22}skipped (brotli is not installed)")
+            return
+        elapsed, compressed = self.best(
+            lambda: brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY), repeat
+        )
+        self.stdout.write(f"{'brotli':<22}{elapsed * 1000:>10.1f}{len(compressed):>12}")
+
+    def best(self, func, repeat):
+        best, result = None, None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def payload(self, total):
+        # Same shape PatientSerializer produces for the patient list.
+        created = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+        return [
+            {
+                'id': i,
+                'user': i % 500 + 1,
+                'user_details': {
+                    'id': i % 500 + 1, 'username': f'user{i % 500}', 'email': f'user{i % 500}@example.com',
+                    'role': 'patient', 'full_name': f'User {i % 500}', 'is_active': True,
+                },
+                'full_name': f'Patient {i}',
+                'email': f'patient{i}@example.com',
+                'age': 20 + i % 60,
+                'gender': ('Male', 'Female', 'Other')[i % 3],
+                'contact_number': f'{5550000000 + i}',
+                'medical_history': 'No known allergies. Annual check-up.' if i % 4 else None,
+                'created_at': (created + datetime.timedelta(minutes=i)).isoformat().replace('+00:00', 'Z'),
+            }
+            for i in range(total)
+        ]
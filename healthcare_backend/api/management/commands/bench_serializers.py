@@ -0,0 +1,88 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.models import CustomUser, Doctor, Patient, PatientDoctorMapping
+from api.row_serializers import DoctorRowSerializer, PatientDoctorMappingRowSerializer, PatientRowSerializer
+from api.serializers import DoctorSerializer, PatientDoctorMappingSerializer, PatientSerializer
+
+
+class Command(BaseCommand):
+    """Measure per-row serialization CPU of the ModelSerializers against the row serializers"""
+
+    help = (
+        "Serialize N patients, doctors and mappings with the ModelSerializers (from model "
+        "instances) and with the row serializers (from .values() dicts), without touching "
+        "the database, and report microseconds per row."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5_000)
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement; the best is reported')
+
+    def handle(self, *args, **options):
+        total, repeat = options['rows'], options['repeat']
+        patients, doctors, mappings = self.instances(total)
+        cases = (
+            ('patients', PatientSerializer, PatientRowSerializer(), patients),
+            ('doctors', DoctorSerializer, DoctorRowSerializer(), doctors),
+            ('mappings', PatientDoctorMappingSerializer, PatientDoctorMappingRowSerializer(), mappings),
+        )
+
+        self.stdout.write(f"{'list':<12}{'serializer us/row':>20}{'rows us/row':>14}{'speedup':>10}")
+        for name, serializer_class, row_serializer, objects in cases:
+            rows = [self.as_row(row_serializer, obj) for obj in objects]
+            expected = serializer_class(objects, many=True).data
+            if row_serializer.serialize(rows) != expected:
+                self.stderr.write(f"{name}: row serializer output differs from {serializer_class.__name__}")
+            slow = self.best(lambda: serializer_class(objects, many=True).data, repeat)
+            fast = self.best(lambda: row_serializer.serialize(rows), repeat)
+            self.stdout.write(
+                f"{name:<12}{slow / total * 1e6:>20.2f}{fast / total * 1e6:>14.2f}{slow / fast:>9.1f}x"
+            )
+
+    def best(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def as_row(self, row_serializer, obj):
+        # What .values() would return for the same object.
+        row = {}
+        for path in row_serializer.paths:
+            value = obj
+            for attr in path.split('__'):
+                value = getattr(value, attr) if value is not None else None
+            row[path] = value
+        return row
+
+    def instances(self, total):
+        created = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+        users = [
+            CustomUser(
+                id=i + 1, username=f'user{i}', email=f'user{i}@example.com', role='patient',
+                first_name='User', last_name=str(i), is_active=True,
+            )
+            for i in range(500)
+        ]
+        patients, doctors, mappings = [], [], []
+        for i in range(total):
+            stamp = created + datetime.timedelta(minutes=i)
+            patients.append(Patient(
+                id=i + 1, user=users[i % 500], full_name=f'Patient {i}', email=f'patient{i}@example.com',
+                age=20 + i % 60, gender=('Male', 'Female', 'Other')[i % 3], contact_number=f'{5550000000 + i}',
+                medical_history='No known allergies.' if i % 4 else None, created_at=stamp,
+            ))
+            doctors.append(Doctor(
+                id=i + 1, full_name=f'Dr. {i}', email=f'doctor{i}@example.com',
+                specializations=['Cardiology', 'Surgery'][:1 + i % 2], license_number=f'LIC-{i}',
+                years_of_experience=i % 40, contact_number=f'{5560000000 + i}', is_approved=bool(i % 5),
+                created_by=users[0] if i % 2 else None, created_at=stamp,
+            ))
+            mappings.append(PatientDoctorMapping(id=i + 1, patient=patients[i], doctor=doctors[i], created_at=stamp))
+        return patients, doctors, mappings
@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.authentication import HealthcareRefreshToken
+from api.models import CustomUser
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def run_load(url, concurrency, duration, headers=None):
+    """
+    Keep ``concurrency`` requests in flight against ``url`` for ``duration``
+    seconds. Returns ``(requests, errors, latencies_in_seconds)``.
+    """
+    import httpx
+
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, headers=headers, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return len(latencies), errors, latencies
+
+
+class Command(BaseCommand):
+    """Compare runserver, sync gunicorn and ASGI gunicorn on the same endpoints"""
+
+    help = (
+        "Start each server on a free local port, drive the same endpoints with "
+        "concurrent keep-alive clients, and report throughput and latency. "
+        "gunicorn-asgi-async serves with ASYNC_VIEWS on; pass several "
+        "--concurrency values (e.g. 10 100 1000) to see how each server "
+        "scales. Needs httpx, gunicorn and uvicorn-worker."
+    )
+
+    SERVERS = ('runserver', 'gunicorn-sync', 'gunicorn-asgi', 'gunicorn-asgi-async')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--servers', nargs='+', choices=self.SERVERS, default=list(self.SERVERS))
+        parser.add_argument(
+            '--endpoints', nargs='+', default=['/api/health/', '/api/v1/doctors/', '/api/v1/auth/profile/'],
+        )
+        parser.add_argument('--email', help='User to authenticate as; without it only public endpoints run')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[64], help='Open connections')
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds per endpoint')
+        parser.add_argument('--workers', type=int, default=4, help='Gunicorn worker processes')
+        parser.add_argument('--threads', type=int, default=1, help='Threads per sync gunicorn worker')
+        parser.add_argument(
+            '--env', action='append', default=[], metavar='NAME=VALUE',
+            help='Extra environment for the servers, e.g. DB_POOL_MODE=pool',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            import httpx  # noqa: F401
+        except ImportError:
+            raise CommandError('bench_servers needs httpx: pip install httpx')
+        # httpx logs every request at INFO.
+        logging.getLogger('httpx').setLevel(logging.WARNING)
+
+        headers = {}
+        endpoints = options['endpoints']
+        if options['email']:
+            user = CustomUser.objects.filter(email__iexact=options['email']).first()
+            if user is None:
+                raise CommandError(f"No user with email {options['email']}")
+            token = HealthcareRefreshToken.for_user(user).access_token
+            headers['Authorization'] = f'Bearer {token}'
+        else:
+            endpoints = [endpoint for endpoint in endpoints if endpoint == '/api/health/']
+            self.stdout.write('No --email given; running public endpoints only.')
+
+        extra_env = dict(item.split('=', 1) for item in options['env'])
+
+        self.stdout.write(
+            f"{'server':<20}{'endpoint':<28}{'conns':>6}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}"
+        )
+        for name in options['servers']:
+            port = free_port()
+            process = self.start(name, port, options, extra_env)
+            try:
+                self.wait_ready(port, process)
+                for endpoint in endpoints:
+                    for concurrency in options['concurrency']:
+                        self.measure(name, port, endpoint, concurrency, options['duration'], headers)
+            finally:
+                process.terminate()
+                try:
+                    process.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    def measure(self, name, port, endpoint, concurrency, duration, headers):
+        url = f'http://127.0.0.1:{port}{endpoint}'
+        requests, errors, latencies = asyncio.run(run_load(url, concurrency, duration, headers))
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0
+        self.stdout.write(
+            f"{name:<20}{endpoint:<28}{concurrency:>6}{requests:>10}{errors:>8}"
+            f"{requests / duration:>10.0f}{p50:>9.1f}{p99:>9.1f}"
+        )
+
+    def start(self, name, port, options, extra_env):
+        env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'healthcare_backend.settings'),
+            **extra_env,
+        }
+        if name == 'runserver':
+            command = [sys.executable, 'manage.py', 'runserver', '--noreload', f'127.0.0.1:{port}']
+        else:
+            env.update({
+                'SERVER_MODE': 'wsgi' if name == 'gunicorn-sync' else 'asgi',
+                'ASYNC_VIEWS': 'True' if name == 'gunicorn-asgi-async' else 'False',
+                'GUNICORN_BIND': f'127.0.0.1:{port}',
+                'WEB_CONCURRENCY': str(options['workers']),
+                'GUNICORN_THREADS': str(options['threads']) if name == 'gunicorn-sync' else '1',
+                'GUNICORN_ACCESSLOG': '',
+                'GUNICORN_LOGLEVEL': 'warning',
+            })
+            command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py']
+        return subprocess.Popen(
+            command, cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+
+    def wait_ready(self, port, process, timeout=30):
+        import httpx
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f'Server exited with status {process.returncode}')
+            try:
+                if httpx.get(f'http://127.0.0.1:{port}/api/health/', timeout=1).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        raise CommandError('Server did not become ready in time')
@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import override_settings
+
+from api.serializers import RegisterSerializer
+
+
+class RollbackBenchmark(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """Register many users whose emails share a local part and count queries"""
+
+    help = (
+        "Register N users with colliding email local parts (info@...) inside a "
+        "rolled-back transaction and report time and queries per registration."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--local-part', default='info')
+
+    def handle(self, *args, **options):
+        total = options['users']
+        max_queries = 0
+        # Password hashing would dwarf the username allocation being measured.
+        with override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']):
+            try:
+                with transaction.atomic():
+                    start = time.perf_counter()
+                    for i in range(total):
+                        serializer = RegisterSerializer(data={
+                            'email': f"{options['local_part']}@clinic{i}.example.com",
+                            'password': 'Bench-pass-9471',
+                            'password2': 'Bench-pass-9471',
+                            'full_name': f'Bench User {i}',
+                            'role': 'patient',
+                        })
+                        serializer.is_valid(raise_exception=True)
+                        queries = []
+                        with connection.execute_wrapper(
+                            lambda execute, sql, *rest: queries.append(sql) or execute(sql, *rest)
+                        ):
+                            serializer.save()
+                        max_queries = max(max_queries, len(queries))
+                    elapsed = time.perf_counter() - start
+                    last_username = serializer.instance.username
+                    raise RollbackBenchmark
+            except RollbackBenchmark:
+                pass
+
+        self.stdout.write(f'registrations:        {total}')
+        self.stdout.write(f'last username:        {last_username}')
+        self.stdout.write(f'total seconds:        {elapsed:.2f}')
+        self.stdout.write(f'registrations/sec:    {total / elapsed:.0f}')
+        self.stdout.write(f'max queries per save: {max_queries}')
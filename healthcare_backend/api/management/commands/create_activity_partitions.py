@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from api.activity import create_partitions, month_start, next_month, partition_name
+
+
+class Command(BaseCommand):
+    """Create the monthly ActivityEvent partitions ahead of time"""
+
+    help = (
+        "Create the ActivityEvent partitions for this month and the next "
+        "--months months. The activity recorder also creates them on demand; "
+        "running this from a scheduler keeps that DDL off the write path."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=3)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("ActivityEvent is only partitioned on PostgreSQL")
+        months = [month_start(timezone.now())]
+        for _ in range(options['months']):
+            months.append(next_month(months[-1]))
+        create_partitions(months)
+        self.stdout.write(self.style.SUCCESS(
+            f"Partitions up to {partition_name(months[-1])} are in place"
+        ))
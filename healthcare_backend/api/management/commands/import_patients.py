@@ -0,0 +1,61 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from api.importers import (
+    ImportFormatError, PatientImporter, check_encoding, detect_format, iter_rows, iter_text_lines
+)
+from api.models import CustomUser
+
+
+class Command(BaseCommand):
+    """Bulk-import patients from a CSV or NDJSON file"""
+
+    help = (
+        "Stream patients from a CSV or NDJSON file, validate them with the "
+        "PatientSerializer rules and insert them in chunks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--owner', required=True,
+                            help='Username, email or id of the user that owns rows without a user column')
+        parser.add_argument('--file-format', choices=['csv', 'ndjson'])
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--method', choices=PatientImporter.METHODS, default='bulk_create')
+        parser.add_argument('--max-errors', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        owner_filter = Q(username=options['owner']) | Q(email=options['owner'])
+        if options['owner'].isdigit():
+            owner_filter |= Q(pk=int(options['owner']))
+        owner = CustomUser.objects.filter(owner_filter).first()
+        if owner is None:
+            raise CommandError(f"User {options['owner']!r} not found")
+
+        try:
+            file_format = detect_format(options['path'], options['file_format'])
+            importer = PatientImporter(
+                default_user=owner,
+                chunk_size=options['chunk_size'],
+                method=options['method'],
+                max_errors=options['max_errors'],
+            )
+        except (ImportFormatError, ValueError) as e:
+            raise CommandError(str(e))
+
+        with open(options['path'], 'rb') as stream:
+            try:
+                check_encoding(stream)
+            except ImportFormatError as e:
+                raise CommandError(str(e))
+            report = importer.run(iter_rows(iter_text_lines(stream), file_format))
+
+        for error in report['errors']:
+            self.stderr.write(json.dumps(error, default=str))
+        if report['errors_truncated']:
+            self.stderr.write(f"... {report['failed'] - len(report['errors'])} more errors not shown")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created']} patients, {report['failed']} rows failed"
+        ))
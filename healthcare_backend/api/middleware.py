@@ -0,0 +1,135 @@
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is in requirements.txt
+    brotli = None
+
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'text/',
+)
+
+
+def accepted_encodings(accept_encoding):
+    """Parse an Accept-Encoding header into ``{coding: q}``, dropping q=0."""
+    encodings = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if q > 0:
+            encodings[coding] = q
+    return encodings
+
+
+def _compressor(encoding):
+    """Return ``(compress, finish)`` callables for one compressed stream."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        return compressor.process, compressor.finish
+    # wbits=31 writes a gzip header and trailer around the deflate stream.
+    compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+
+def compress_stream(chunks, encoding):
+    compress, finish = _compressor(encoding)
+    for chunk in chunks:
+        data = compress(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+async def acompress_stream(chunks, encoding):
+    compress, finish = _compressor(encoding)
+    async for chunk in chunks:
+        data = compress(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress API responses with Brotli or gzip, whichever the client
+    prefers (Brotli on a tie).
+
+    Bodies smaller than COMPRESSION_MIN_SIZE go out as they are, since
+    compressing them costs more than it saves. Streaming responses, such as
+    the exports, are compressed as one stream while they are generated.
+    Files are left to WhiteNoise, which serves precompressed copies.
+
+    Unlike Django's GZipMiddleware there is no length randomisation, so the
+    endpoints in COMPRESSION_EXCLUDED_URL_NAMES, which return tokens, are
+    sent uncompressed instead (BREACH).
+    """
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or isinstance(response, FileResponse):
+            return response
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and match.url_name in settings.COMPRESSION_EXCLUDED_URL_NAMES:
+            return response
+        content_type = response.get('Content-Type', '')
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encodings = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+
+        encoding = self.choose(encodings)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(response.streaming_content, encoding)
+            else:
+                response.streaming_content = compress_stream(response.streaming_content, encoding)
+            del response['Content-Length']
+            return self.finish(response, encoding)
+
+        if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        if encoding == 'br':
+            compressed = brotli.compress(response.content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            compressed = gzip.compress(response.content, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        return self.finish(response, encoding)
+
+    def choose(self, encodings):
+        br = encodings.get('br', 0) if brotli is not None else 0
+        gz = encodings.get('gzip', 0)
+        if br and br >= gz:
+            return 'br'
+        return 'gzip' if gz else None
+
+    def finish(self, response, encoding):
+        # The body's bytes changed, so a strong ETag no longer holds.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
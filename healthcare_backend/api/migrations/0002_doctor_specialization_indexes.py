@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:17
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='doctor',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['specializations'], name='doctor_specializations_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='doctor',
+            index=models.Index(fields=['is_approved', 'years_of_experience'], name='doctor_approved_experience_idx'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:20
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_for_duplicates(apps, schema_editor):
+    """
+    Stop before adding the constraints if existing rows would violate them,
+    listing each duplicate group so they can be merged or renamed by hand.
+    Accounts and licences are not merged automatically: picking the
+    survivor is a decision about real people's records.
+    """
+    CustomUser = apps.get_model('api', 'CustomUser')
+    Doctor = apps.get_model('api', 'Doctor')
+    problems = []
+    emails = (
+        CustomUser.objects.annotate(email_lower=Lower('email'))
+        .values('email_lower').annotate(rows=Count('id')).filter(rows__gt=1)
+    )
+    for group in emails:
+        ids = list(
+            CustomUser.objects.annotate(email_lower=Lower('email'))
+            .filter(email_lower=group['email_lower']).order_by('id').values_list('id', flat=True)
+        )
+        problems.append(f"email {group['email_lower']!r} (case-insensitive): custom_user ids {ids}")
+    licenses = (
+        Doctor.objects.exclude(license_number='')
+        .values('license_number').annotate(rows=Count('id')).filter(rows__gt=1)
+    )
+    for group in licenses:
+        ids = list(
+            Doctor.objects.filter(license_number=group['license_number'])
+            .order_by('id').values_list('id', flat=True)
+        )
+        problems.append(f"license_number {group['license_number']!r}: doctor ids {ids}")
+    if problems:
+        raise RuntimeError(
+            "Cannot add unique_custom_user_email / unique_doctor_license_number; "
+            "resolve these duplicates and run migrate again:\n  " + "\n  ".join(problems)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_doctor_specialization_indexes'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_for_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='customuser',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='unique_custom_user_email'),
+        ),
+        migrations.AddConstraint(
+            model_name='doctor',
+            constraint=models.UniqueConstraint(condition=models.Q(('license_number', ''), _negated=True), fields=('license_number',), name='unique_doctor_license_number'),
+        ),
+    ]
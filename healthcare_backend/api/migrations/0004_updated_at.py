@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Existing rows were last changed no later than now; created_at is the
+    # best known value and keeps Last-Modified stable across the upgrade.
+    for model_name in ('Patient', 'Doctor', 'PatientDoctorMapping'):
+        model = apps.get_model('api', model_name)
+        model.objects.update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_unique_email_and_license'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doctor',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='patient',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='patientdoctormapping',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
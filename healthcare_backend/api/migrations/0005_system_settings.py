@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:51
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SystemSettings',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('auto_logout', models.BooleanField(default=True)),
+                ('session_timeout', models.PositiveIntegerField(default=60, validators=[django.core.validators.MinValueValidator(5), django.core.validators.MaxValueValidator(10080)])),
+                ('email_notifications', models.BooleanField(default=True)),
+                ('data_retention', models.PositiveIntegerField(default=365, validators=[django.core.validators.MinValueValidator(1)])),
+                ('max_login_attempts', models.PositiveIntegerField(default=5, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(100)])),
+                ('password_min_length', models.PositiveIntegerField(default=8, validators=[django.core.validators.MinValueValidator(8), django.core.validators.MaxValueValidator(128)])),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'system settings',
+                'constraints': [models.CheckConstraint(condition=models.Q(('id', 1)), name='system_settings_singleton')],
+            },
+        ),
+    ]
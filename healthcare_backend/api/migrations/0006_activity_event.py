@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:56
+
+import datetime
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+# PostgreSQL cannot turn an existing table into a partitioned one, and the
+# primary key of a partitioned table must include the partition key, so
+# the table is created by hand. Django still sees a plain ``id`` primary
+# key, which the sequence keeps unique.
+CREATE_PARTITIONED_TABLE = """
+CREATE TABLE "api_activityevent" (
+    "id" bigserial NOT NULL,
+    "occurred_at" timestamp with time zone NOT NULL,
+    "action" varchar(50) NOT NULL,
+    "object_type" varchar(30) NOT NULL,
+    "object_id" bigint NULL,
+    "details" jsonb NOT NULL,
+    "user_id" bigint NOT NULL,
+    PRIMARY KEY ("id", "occurred_at")
+) PARTITION BY RANGE ("occurred_at");
+CREATE TABLE "api_activityevent_default" PARTITION OF "api_activityevent" DEFAULT;
+CREATE INDEX "activity_user_time_idx" ON "api_activityevent" ("user_id", "occurred_at" DESC, "id" DESC);
+CREATE INDEX "activity_time_idx" ON "api_activityevent" ("occurred_at" DESC, "id" DESC);
+"""
+
+
+def create_activity_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        schema_editor.create_model(apps.get_model('api', 'ActivityEvent'))
+        return
+    schema_editor.execute(CREATE_PARTITIONED_TABLE)
+    # Last month to two months ahead; api.activity creates later ones.
+    today = datetime.date.today()
+    month = today.replace(day=1) - datetime.timedelta(days=1)
+    for _ in range(4):
+        month = month.replace(day=1)
+        following = (month + datetime.timedelta(days=32)).replace(day=1)
+        schema_editor.execute(
+            f'CREATE TABLE "api_activityevent_p{month:%Y%m}" PARTITION OF "api_activityevent" '
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{following.isoformat()} 00:00:00+00')"
+        )
+        month = following
+
+
+def drop_activity_table(apps, schema_editor):
+    # Partitions go with the partitioned table.
+    schema_editor.execute('DROP TABLE "api_activityevent"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_system_settings'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='ActivityEvent',
+                    fields=[
+                        ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                        ('occurred_at', models.DateTimeField(default=django.utils.timezone.now)),
+                        ('action', models.CharField(choices=[('login', 'Logged in'), ('registration', 'Registered'), ('patient.viewed', 'Viewed patient record'), ('mapping.created', 'Mapped patient to doctor'), ('mapping.deleted', 'Removed patient-doctor mapping'), ('system_settings.updated', 'Updated system settings')], max_length=50)),
+                        ('object_type', models.CharField(blank=True, max_length=30)),
+                        ('object_id', models.BigIntegerField(blank=True, null=True)),
+                        ('details', models.JSONField(blank=True, default=dict)),
+                        ('user', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'indexes': [models.Index(fields=['user', '-occurred_at', '-id'], name='activity_user_time_idx'), models.Index(fields=['-occurred_at', '-id'], name='activity_time_idx')],
+                    },
+                ),
+            ],
+        ),
+        # After the CreateModel, so ``apps`` already has ActivityEvent.
+        migrations.RunPython(create_activity_table, drop_activity_table),
+    ]
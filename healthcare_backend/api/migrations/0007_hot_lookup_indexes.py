@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:00
+
+import django.db.models.deletion
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Built CONCURRENTLY so the tables stay writable on a live database,
+    # and before the indexes they replace are dropped.
+    atomic = False
+
+    dependencies = [
+        ('api', '0006_activity_event'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='customuser',
+            index=models.Index(fields=['role', 'is_active'], name='custom_user_role_active_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='doctor',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['years_of_experience'], name='doctor_approved_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='doctor',
+            index=models.Index(condition=models.Q(('is_approved', False)), fields=['created_at'], name='doctor_pending_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='patientdoctormapping',
+            index=models.Index(fields=['doctor', 'created_at', 'id'], name='mapping_doctor_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='patientdoctormapping',
+            index=models.Index(fields=['created_at', 'id'], name='mapping_created_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='doctor',
+            name='doctor_approved_experience_idx',
+        ),
+        # A plain AlterField would drop and re-validate the foreign keys
+        # just to lose their indexes; drop only the indexes instead.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='patientdoctormapping',
+                    name='doctor',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='api.doctor'),
+                ),
+                migrations.AlterField(
+                    model_name='patientdoctormapping',
+                    name='patient',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='api.patient'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    'DROP INDEX CONCURRENTLY IF EXISTS "api_patientdoctormapping_doctor_id_6bb17fb6"',
+                    'CREATE INDEX CONCURRENTLY "api_patientdoctormapping_doctor_id_6bb17fb6" '
+                    'ON "api_patientdoctormapping" ("doctor_id")',
+                ),
+                migrations.RunSQL(
+                    'DROP INDEX CONCURRENTLY IF EXISTS "api_patientdoctormapping_patient_id_6600abc5"',
+                    'CREATE INDEX CONCURRENTLY "api_patientdoctormapping_patient_id_6600abc5" '
+                    'ON "api_patientdoctormapping" ("patient_id")',
+                ),
+            ],
+        ),
+    ]
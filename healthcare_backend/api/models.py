@@ -1,5 +1,9 @@
-from django.db import models
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import connections, models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser, BaseUserManager
+from django.contrib.postgres.indexes import GinIndex
+from django.db.models.functions import Lower
 
 
 class CustomUserManager(BaseUserManager):
@@ -17,10 +21,7 @@ class CustomUserManager(BaseUserManager):
         extra_fields.setdefault('is_superuser', True)
         extra_fields.setdefault('role', 'admin')
         
-        user = self.create_user(username, email, password, **extra_fields)
-        user.set_password(password)
-        user.save(using=self._db)
-        return user
+        return self.create_user(username, email, password, **extra_fields)
 
 
 class CustomUser(AbstractUser):
@@ -52,6 +53,14 @@ class CustomUser(AbstractUser):
 
     class Meta:
         db_table = 'custom_user'
+        constraints = [
+            # Case-insensitive: "Ann@x.com" and "ann@x.com" are one account.
+            models.UniqueConstraint(Lower('email'), name='unique_custom_user_email'),
+        ]
+        indexes = [
+            # Admin recipients for notifications: role='admin' AND is_active.
+            models.Index(fields=['role', 'is_active'], name='custom_user_role_active_idx'),
+        ]
 
     def __str__(self):
         return self.username
@@ -72,6 +81,7 @@ class Patient(models.Model):
     contact_number = models.CharField(max_length=15, default='')
     medical_history = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.full_name
@@ -112,20 +122,156 @@ class Doctor(models.Model):
         related_name='created_doctors'
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # Blank means "not provided yet", so only real numbers must be unique.
+            models.UniqueConstraint(
+                fields=['license_number'],
+                condition=~models.Q(license_number=''),
+                name='unique_doctor_license_number',
+            ),
+        ]
+        indexes = [
+            # jsonb_path_ops serves `specializations @> '["Cardiology"]'`
+            # (the `__contains` lookup) with a smaller index than the default.
+            GinIndex(fields=['specializations'], name='doctor_specializations_gin', opclasses=['jsonb_path_ops']),
+            # The public directory only ever reads approved doctors, and the
+            # approval queue only pending ones; each partial index holds just
+            # its own rows.
+            models.Index(
+                fields=['years_of_experience'], condition=models.Q(is_approved=True),
+                name='doctor_approved_idx',
+            ),
+            models.Index(fields=['created_at'], condition=models.Q(is_approved=False), name='doctor_pending_idx'),
+        ]
 
     def __str__(self) -> str:
         return f"{self.full_name} ({', '.join(self.specializations)})"
 
 
+class PatientDoctorMappingManager(models.Manager):
+    def insert_missing(self, doctor_id, patient_ids):
+        """
+        Map ``patient_ids`` to the doctor in one INSERT, skipping pairs that
+        already exist (including ones a concurrent request just inserted).
+        Returns {patient_id: mapping_id} for the rows this call inserted.
+        """
+        if not patient_ids:
+            return {}
+        table = connections[self.db].ops.quote_name(self.model._meta.db_table)
+        now = timezone.now()
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (patient_id, doctor_id, created_at, updated_at) "
+                f"SELECT patient_id, %s, %s, %s FROM unnest(%s::bigint[]) AS patient_id "
+                f"ON CONFLICT (patient_id, doctor_id) DO NOTHING "
+                f"RETURNING patient_id, id",
+                [doctor_id, now, now, list(patient_ids)],
+            )
+            return dict(cursor.fetchall())
+
+
 class PatientDoctorMapping(models.Model):
-    patient = models.ForeignKey(Patient, on_delete=models.CASCADE)
-    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE)
+    # Lookups by patient use unique_patient_doctor and lookups by doctor
+    # use mapping_doctor_created_idx, so neither needs its own index.
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, db_index=False)
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, db_index=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = PatientDoctorMappingManager()
 
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['patient', 'doctor'], name='unique_patient_doctor')
         ]
+        indexes = [
+            # Keyset pages in (created_at, id) order: a doctor's roster and
+            # mappings, and the admin's full mapping list.
+            models.Index(fields=['doctor', 'created_at', 'id'], name='mapping_doctor_created_idx'),
+            models.Index(fields=['created_at', 'id'], name='mapping_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.patient.full_name} - {self.doctor.full_name}"
+
+
+class SystemSettings(models.Model):
+    """
+    Admin-editable runtime settings, stored as a single row (pk=1).
+
+    Read them with api.system_settings.get_system_settings(), which serves
+    a process-local copy instead of querying this table.
+    """
+    SINGLETON_ID = 1
+
+    auto_logout = models.BooleanField(default=True)
+    # Minutes without a token refresh before the session ends.
+    session_timeout = models.PositiveIntegerField(
+        default=60, validators=[MinValueValidator(5), MaxValueValidator(7 * 24 * 60)]
+    )
+    email_notifications = models.BooleanField(default=True)
+    # Days
+    data_retention = models.PositiveIntegerField(default=365, validators=[MinValueValidator(1)])
+    max_login_attempts = models.PositiveIntegerField(
+        default=5, validators=[MinValueValidator(1), MaxValueValidator(100)]
+    )
+    password_min_length = models.PositiveIntegerField(
+        default=8, validators=[MinValueValidator(8), MaxValueValidator(128)]
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+    updated_by = models.ForeignKey(
+        CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+
+    class Meta:
+        verbose_name_plural = 'system settings'
+        constraints = [
+            models.CheckConstraint(condition=models.Q(id=1), name='system_settings_singleton'),
+        ]
+
+    def __str__(self):
+        return 'System settings'
+
+
+class ActivityEvent(models.Model):
+    """
+    Append-only log of who did what, written in batches by
+    api.activity.activity_recorder.
+
+    On PostgreSQL the table is range-partitioned by month on occurred_at
+    (see migration 0006), so its primary key is really (id, occurred_at).
+    Events outlive their user: there is no foreign key constraint, and
+    deleting a user leaves their events in place.
+    """
+    ACTION_CHOICES = (
+        ('login', 'Logged in'),
+        ('registration', 'Registered'),
+        ('patient.viewed', 'Viewed patient record'),
+        ('mapping.created', 'Mapped patient to doctor'),
+        ('mapping.deleted', 'Removed patient-doctor mapping'),
+        ('system_settings.updated', 'Updated system settings'),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    occurred_at = models.DateTimeField(default=timezone.now)
+    user = models.ForeignKey(
+        CustomUser, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='+'
+    )
+    action = models.CharField(max_length=50, choices=ACTION_CHOICES)
+    object_type = models.CharField(max_length=30, blank=True)
+    object_id = models.BigIntegerField(null=True, blank=True)
+    details = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            # One user's history, newest first, in keyset order.
+            models.Index(fields=['user', '-occurred_at', '-id'], name='activity_user_time_idx'),
+            # Everyone's recent activity, newest first.
+            models.Index(fields=['-occurred_at', '-id'], name='activity_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.action} at {self.occurred_at:%Y-%m-%d %H:%M:%S}"
@@ -0,0 +1,170 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a fixed ordering.
+
+    Unlike offset pagination the cost of a page does not grow with its
+    position in the table: every page is a single indexed range scan
+    ``WHERE (a, b) < (last_a, last_b) ORDER BY a DESC, b DESC LIMIT n``.
+    The last field of ``ordering`` must be unique (usually the primary key)
+    so the cursor always points at exactly one row.
+
+    The paginator is split in two steps so it can be used with sync and
+    async querysets alike:
+
+        page_qs = paginator.get_page_queryset(queryset, request)
+        rows = list(page_qs)
+        return paginator.get_paginated_response(paginator.build_page(rows))
+    """
+    ordering = ('-created_at', '-id')
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 50
+    max_page_size = 500
+
+    def __init__(self, ordering=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+        self.request = None
+        self.page_size_value = self.page_size
+        self.next_position = None
+        self.has_previous = False
+
+    # -- cursor encoding -------------------------------------------------
+
+    def encode_cursor(self, position):
+        raw = json.dumps(position, separators=(',', ':'), default=str)
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError):
+            raise ValidationError({self.cursor_query_param: 'Invalid cursor.'})
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise ValidationError({self.cursor_query_param: 'Invalid cursor.'})
+        return position
+
+    def _model_fields(self, model):
+        """The model field behind each ordering name, following ``__`` relations."""
+        fields = []
+        for name in self._field_names():
+            opts = model._meta
+            *relations, last = name.split('__')
+            for relation in relations:
+                opts = opts.get_field(relation).related_model._meta
+            fields.append(opts.pk if last == 'pk' else opts.get_field(last))
+        return fields
+
+    def parse_position(self, position, model):
+        """
+        Convert a decoded cursor to field values, so a tampered cursor is a
+        400 rather than an error from the database.
+        """
+        values = []
+        for field, value in zip(self._model_fields(model), position):
+            if value is None or isinstance(value, (dict, list)):
+                raise ValidationError({self.cursor_query_param: 'Invalid cursor.'})
+            try:
+                values.append(field.to_python(value))
+            except (DjangoValidationError, ValueError, TypeError):
+                raise ValidationError({self.cursor_query_param: 'Invalid cursor.'})
+        return values
+
+    # -- queryset --------------------------------------------------------
+
+    def get_page_size(self, request):
+        value = request.query_params.get(self.page_size_query_param)
+        if value is None:
+            return self.page_size
+        try:
+            size = int(value)
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: 'A valid integer is required.'})
+        if size <= 0:
+            raise ValidationError({self.page_size_query_param: 'Must be a positive integer.'})
+        return min(size, self.max_page_size)
+
+    def _field_names(self):
+        return [field.lstrip('-') for field in self.ordering]
+
+    def _after(self, position):
+        """Build ``(f1, f2, ...) > (v1, v2, ...)`` honouring each field's direction."""
+        condition = Q()
+        names = self._field_names()
+        for index, field in enumerate(self.ordering):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {names[i]: position[i] for i in range(index)}
+            condition |= Q(**equal, **{f'{names[index]}__{lookup}': position[index]})
+        return condition
+
+    def get_page_queryset(self, queryset, request):
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        cursor = request.query_params.get(self.cursor_query_param)
+
+        queryset = queryset.order_by(*self.ordering)
+        if cursor:
+            position = self.parse_position(self.decode_cursor(cursor), queryset.model)
+            queryset = queryset.filter(self._after(position))
+            self.has_previous = True
+        # Fetch one extra row to find out whether a next page exists.
+        return queryset[:self.page_size_value + 1]
+
+    def _position(self, row):
+        names = self._field_names()
+        if isinstance(row, dict):
+            return [row[name] for name in names]
+        position = []
+        for name in names:
+            value = row
+            for attr in name.split('__'):
+                value = getattr(value, attr)
+            position.append(value)
+        return position
+
+    def build_page(self, rows):
+        rows = list(rows)
+        if len(rows) > self.page_size_value:
+            rows = rows[:self.page_size_value]
+            self.next_position = self._position(rows[-1])
+        else:
+            self.next_position = None
+        return rows
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.build_page(self.get_page_queryset(queryset, request))
+
+    # -- response --------------------------------------------------------
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_first_link(self):
+        if not self.has_previous:
+            return None
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'first': self.get_first_link(),
+            'results': data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
@@ -0,0 +1,15 @@
+from django.contrib.auth import password_validation
+
+from .system_settings import get_system_settings
+
+
+class MinimumLengthValidator(password_validation.MinimumLengthValidator):
+    """MinimumLengthValidator whose minimum is SystemSettings.password_min_length."""
+
+    def __init__(self):
+        # The base class stores a fixed min_length; ours is read per call.
+        pass
+
+    @property
+    def min_length(self):
+        return get_system_settings()['password_min_length']
@@ -0,0 +1,96 @@
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson.
+
+    Output matches JSONRenderer's compact form: values orjson does not
+    handle natively, and datetimes (so they keep DRF's ``Z`` suffix), go
+    through DRF's encoder, and U+2028/U+2029 are escaped the same way.
+    Indented, ASCII-only or non-compact output falls back to the stdlib.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if orjson is None or indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except TypeError:
+            # e.g. integers wider than 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class PrometheusRenderer(BaseRenderer):
+    """
+    Prometheus text exposition format for MetricsView's report, chosen
+    with ``?format=prometheus`` or ``Accept: text/plain``. Times are
+    converted from milliseconds to seconds, Prometheus' base unit.
+    """
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    HISTOGRAMS = {
+        'latency_ms': ('api_request_duration_seconds', 0.001, 'Request latency of sampled requests.'),
+        'db_ms': ('api_request_db_duration_seconds', 0.001, 'Time spent in SQL queries per sampled request.'),
+        'serializer_ms': (
+            'api_request_serializer_duration_seconds', 0.001, 'Time spent serializing per sampled request.'
+        ),
+        'queries': ('api_request_queries', 1, 'SQL queries per sampled request.'),
+    }
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, dict) or 'endpoints' not in data:
+            # Errors such as a 403 detail.
+            return f'# {data}\n'.encode()
+
+        lines = [
+            '# HELP api_request_metrics_sample_rate Fraction of requests recorded in the api_request_* histograms.',
+            '# TYPE api_request_metrics_sample_rate gauge',
+            f"api_request_metrics_sample_rate {data['sample_rate']}",
+        ]
+        for key, (name, scale, help_text) in self.HISTOGRAMS.items():
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+            for entry in data['endpoints']:
+                labels = f'endpoint="{self.escape(entry["endpoint"])}",method="{entry["method"]}"'
+                histogram = entry[key]
+                for bound, count in histogram['buckets']:
+                    le = bound if bound == '+Inf' else f'{bound * scale:g}'
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+                lines.append(f'{name}_sum{{{labels}}} {histogram["sum"] * scale:g}')
+                lines.append(f'{name}_count{{{labels}}} {histogram["count"]}')
+
+        tasks = data.get('tasks') or {}
+        lines += ['# HELP api_task_events_total Celery task events.', '# TYPE api_task_events_total counter']
+        for task, metrics in tasks.items():
+            for event in ('started', 'succeeded', 'failed', 'retried'):
+                lines.append(f'api_task_events_total{{task="{self.escape(task)}",event="{event}"}} {metrics[event]}')
+        lines += [
+            '# HELP api_task_runtime_seconds_total Total Celery task runtime.',
+            '# TYPE api_task_runtime_seconds_total counter',
+        ]
+        for task, metrics in tasks.items():
+            lines.append(f'api_task_runtime_seconds_total{{task="{self.escape(task)}"}} {metrics["runtime_ms"] / 1000:g}')
+        return ('\n'.join(lines) + '\n').encode()
+
+    @staticmethod
+    def escape(value):
+        return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
@@ -0,0 +1,206 @@
+"""
+Read-only serializers for list endpoints, working on ``.values()`` rows.
+
+A ModelSerializer builds a model instance per row and then runs every
+field's get_attribute() and to_representation() on it, which on a list of
+plain columns costs more CPU than the query. The classes here read the
+columns they need with ``.values()`` and build the same dicts directly.
+Their output must match the serializers in api.serializers exactly; the
+parity tests in api.tests check it.
+
+    rows = PatientRowSerializer().values(Patient.objects.all())
+    data = PatientRowSerializer().serialize(rows)
+"""
+from operator import itemgetter
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .instrumentation import timed_serialization
+from .models import ActivityEvent
+
+_datetime_field = serializers.DateTimeField()
+
+_activity_labels = dict(ActivityEvent.ACTION_CHOICES)
+
+
+def _list(value):
+    return None if value is None else list(value)
+
+
+def _full_name(first_name, last_name):
+    return f"{first_name} {last_name}".strip()
+
+
+def _activity_label(action):
+    return _activity_labels.get(action, action)
+
+
+class Column:
+    """
+    One output field: the ``.values()`` paths it reads and ``build``,
+    which turns their values into the output value. Without ``build`` the
+    single path's value is used as is.
+    """
+
+    def __init__(self, *paths, build=None):
+        self.paths = paths
+        self.build = build
+
+    def getter(self, prefix, tz):
+        paths = [prefix + path for path in self.paths]
+        if self.build is None:
+            return itemgetter(paths[0])
+        build = self.build
+        if len(paths) == 1:
+            path = paths[0]
+            return lambda row: build(row[path])
+        get = itemgetter(*paths)
+        return lambda row: build(*get(row))
+
+
+class DateTimeColumn(Column):
+    """
+    DateTimeField output. ``tz`` is the current time zone, looked up once
+    per serialize() rather than for every value as DateTimeField does;
+    anything but an aware datetime rendered as ISO 8601 goes through
+    DateTimeField itself.
+    """
+
+    def getter(self, prefix, tz):
+        path = prefix + self.paths[0]
+        to_representation = _datetime_field.to_representation
+        if tz is None or api_settings.DATETIME_FORMAT != ISO_8601:
+            return lambda row: None if row[path] is None else to_representation(row[path])
+
+        def get(row):
+            value = row[path]
+            if value is None:
+                return None
+            if value.tzinfo is None:
+                return to_representation(value)
+            value = value.astimezone(tz).isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return get
+
+
+class Nested(Column):
+    """A nested serializer over the related object ``relation``; None when the relation is null."""
+
+    def __init__(self, serializer_class, relation):
+        self.serializer_class = serializer_class
+        self.relation = relation
+        self.paths = tuple(f'{relation}__{path}' for path in serializer_class().paths)
+
+    def getter(self, prefix, tz):
+        inner_prefix = f'{prefix}{self.relation}__'
+        getters = self.serializer_class(prefix=inner_prefix).getters(tz)
+        pk = inner_prefix + 'id'
+        return lambda row: None if row[pk] is None else {name: get(row) for name, get in getters}
+
+
+class RowSerializer:
+    """
+    Base class. ``columns`` maps output field names, in output order, to
+    Columns. ``fields`` restricts the output like DynamicFieldsMixin;
+    ``prefix`` reads the rows through a relation (e.g. ``'patient__'``
+    when serializing patients from a mapping queryset).
+    """
+    columns = {}
+
+    def __init__(self, fields=None, prefix=''):
+        names = [name for name in self.columns if fields is None or name in fields]
+        self.prefix = prefix
+        self.fields = [(name, self.columns[name]) for name in names]
+        self.paths = list(dict.fromkeys(
+            prefix + path for name in names for path in self.columns[name].paths
+        ))
+
+    def values(self, queryset, *extra):
+        """``queryset.values()`` with the paths this serializer reads, plus ``extra``."""
+        return queryset.values(*dict.fromkeys([*self.paths, *extra]))
+
+    def getters(self, tz):
+        return [(name, column.getter(self.prefix, tz)) for name, column in self.fields]
+
+    def to_representation(self, row):
+        return self.serialize([row])[0]
+
+    @timed_serialization
+    def serialize(self, rows):
+        getters = self.getters(timezone.get_current_timezone() if settings.USE_TZ else None)
+        return [{name: get(row) for name, get in getters} for row in rows]
+
+
+class UserRowSerializer(RowSerializer):
+    """UserSerializer."""
+    columns = {
+        'id': Column('id'),
+        'username': Column('username'),
+        'email': Column('email'),
+        'role': Column('role'),
+        'full_name': Column('first_name', 'last_name', build=_full_name),
+        'is_active': Column('is_active'),
+    }
+
+
+class PatientRowSerializer(RowSerializer):
+    """PatientSerializer."""
+    columns = {
+        'id': Column('id'),
+        'user': Column('user_id'),
+        'user_details': Nested(UserRowSerializer, 'user'),
+        'full_name': Column('full_name'),
+        'email': Column('email'),
+        'age': Column('age'),
+        'gender': Column('gender'),
+        'contact_number': Column('contact_number'),
+        'medical_history': Column('medical_history'),
+        'created_at': DateTimeColumn('created_at'),
+    }
+
+
+class DoctorRowSerializer(RowSerializer):
+    """DoctorSerializer."""
+    columns = {
+        'id': Column('id'),
+        'full_name': Column('full_name'),
+        'email': Column('email'),
+        'specializations': Column('specializations'),
+        'license_number': Column('license_number'),
+        'years_of_experience': Column('years_of_experience'),
+        'contact_number': Column('contact_number'),
+        'is_approved': Column('is_approved'),
+        'created_by': Column('created_by_id'),
+        'created_by_details': Nested(UserRowSerializer, 'created_by'),
+        'created_at': DateTimeColumn('created_at'),
+    }
+
+
+class PatientDoctorMappingRowSerializer(RowSerializer):
+    """PatientDoctorMappingSerializer."""
+    columns = {
+        'id': Column('id'),
+        'patient': Column('patient_id'),
+        'patient_name': Column('patient__full_name'),
+        'doctor': Column('doctor_id'),
+        'doctor_name': Column('doctor__full_name'),
+        'doctor_specializations': Column('doctor__specializations', build=_list),
+        'created_at': DateTimeColumn('created_at'),
+    }
+
+
+class ActivityEventRowSerializer(RowSerializer):
+    """ActivityEvent rows for UserActivityView, which adds ``username``."""
+    columns = {
+        'id': Column('id'),
+        'user_id': Column('user_id'),
+        'type': Column('action'),
+        'activity': Column('action', build=_activity_label),
+        'object_type': Column('object_type'),
+        'object_id': Column('object_id'),
+        'details': Column('details'),
+        'timestamp': DateTimeColumn('occurred_at'),
+    }
@@ -1,21 +1,109 @@
+import re
+import secrets
+
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Length
 from rest_framework import serializers
-from .models import Patient, Doctor, PatientDoctorMapping, CustomUser
+from .models import Patient, Doctor, PatientDoctorMapping, CustomUser, SystemSettings
 from django.contrib.auth.password_validation import validate_password
 import uuid
 
 
-class UserSerializer(serializers.ModelSerializer):
+def integrity_error_to_validation_error(exc, errors):
+    """
+    Translate a unique-constraint IntegrityError into the ValidationError the
+    serializer would have raised from a pre-insert check.
+
+    ``errors`` maps constraint names to error details. Returns None when the
+    violated constraint is not one of them.
+    """
+    diag = getattr(exc.__cause__, 'diag', None)
+    constraint = getattr(diag, 'constraint_name', None)
+    for name, detail in errors.items():
+        if constraint == name or (constraint is None and name in str(exc)):
+            return serializers.ValidationError(detail)
+    return None
+
+
+def next_free_username(base):
+    """
+    Return ``base`` or ``base<n>`` one past the highest numeric suffix in use.
+
+    One query: a prefix scan on the username index (LIKE 'base%'), narrowed
+    to ``base`` plus an optional number and ordered so the longest, then
+    greatest, suffix comes first. Independent of how many users share
+    the base.
+    """
+    pattern = rf'^{re.escape(base)}([1-9][0-9]*)?$'
+    last = (
+        CustomUser.objects
+        .filter(username__startswith=base, username__regex=pattern)
+        .annotate(username_length=Length('username'))
+        .order_by('-username_length', '-username')
+        .values_list('username', flat=True)
+        .first()
+    )
+    if last is None:
+        return base
+    return f"{base}{int(last[len(base):] or 0) + 1}"
+
+
+class UniqueConstraintErrorsMixin:
+    """
+    Let the database enforce uniqueness instead of a racy SELECT before the
+    INSERT. Violations of the constraints listed in ``constraint_errors``
+    become the usual 400 ValidationError.
+    """
+    constraint_errors = {}
+
+    def _save_checked(self, save, *args):
+        try:
+            with transaction.atomic():
+                return save(*args)
+        except IntegrityError as exc:
+            error = integrity_error_to_validation_error(exc, self.constraint_errors)
+            if error is None:
+                raise
+            raise error from exc
+
+    def create(self, validated_data):
+        return self._save_checked(super().create, validated_data)
+
+    def update(self, instance, validated_data):
+        return self._save_checked(super().update, instance, validated_data)
+
+
+class DynamicFieldsMixin:
+    """
+    Lets callers restrict the serialized output with ``fields=[...]``,
+    e.g. ``PatientSerializer(patients, many=True, fields=['id', 'full_name'])``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
+class UserSerializer(UniqueConstraintErrorsMixin, serializers.ModelSerializer):
     full_name = serializers.SerializerMethodField()
 
     class Meta:
         model = CustomUser
         fields = ['id', 'username', 'email', 'role', 'full_name', 'is_active']
 
+    constraint_errors = {
+        'unique_custom_user_email': {'email': ["Email already exists."]},
+    }
+
     def get_full_name(self, obj):
         return f"{obj.first_name} {obj.last_name}".strip()
 
 
-class RegisterSerializer(serializers.ModelSerializer):
+class RegisterSerializer(UniqueConstraintErrorsMixin, serializers.ModelSerializer):
+    email = serializers.EmailField(max_length=254)
     password = serializers.CharField(write_only=True, required=True, validators=[validate_password])
     password2 = serializers.CharField(write_only=True, required=True)
     full_name = serializers.CharField(write_only=True, required=True)
@@ -24,17 +112,20 @@ class RegisterSerializer(serializers.ModelSerializer):
         model = CustomUser
         fields = ['email', 'password', 'password2', 'full_name', 'role']
 
+    constraint_errors = {
+        'unique_custom_user_email': {'email': ["Email already exists."]},
+    }
+    USERNAME_ATTEMPTS = 3
+
     def validate(self, attrs):
         if attrs['password'] != attrs['password2']:
             raise serializers.ValidationError({"password": "Password fields didn't match."})
         return attrs
 
-    def validate_email(self, value):
-        if CustomUser.objects.filter(email=value).exists():
-            raise serializers.ValidationError("Email already exists.")
-        return value
-
     def create(self, validated_data):
+        return self._save_checked(self._create_user, validated_data)
+
+    def _create_user(self, validated_data):
         full_name = validated_data.pop('full_name')
         password2 = validated_data.pop('password2')
         role = validated_data.pop('role', 'user')
@@ -45,25 +136,31 @@ class RegisterSerializer(serializers.ModelSerializer):
         last_name = name_parts[1] if len(name_parts) > 1 else ""
 
         # Generate username from email
-        username = validated_data['email'].split('@')[0]
-        # Ensure username is unique
-        base_username = username
-        counter = 1
-        while CustomUser.objects.filter(username=username).exists():
-            username = f"{base_username}{counter}"
-            counter += 1
-
-        user = CustomUser.objects.create_user(
-            username=username,
-            first_name=first_name,
-            last_name=last_name,
-            role=role,
-            **validated_data
-        )
-        return user
-
-
-class PatientSerializer(serializers.ModelSerializer):
+        base_username = validated_data['email'].split('@')[0]
+
+        # Two concurrent signups can pick the same next username; the
+        # loser retries against the unique index rather than pre-checking.
+        for attempt in range(self.USERNAME_ATTEMPTS):
+            if attempt < self.USERNAME_ATTEMPTS - 1:
+                username = next_free_username(base_username)
+            else:
+                username = f"{base_username}{secrets.token_hex(4)}"
+            try:
+                with transaction.atomic():
+                    return CustomUser.objects.create_user(
+                        username=username,
+                        first_name=first_name,
+                        last_name=last_name,
+                        role=role,
+                        **validated_data
+                    )
+            except IntegrityError as exc:
+                constraint = getattr(getattr(exc.__cause__, 'diag', None), 'constraint_name', None)
+                if 'username' not in (constraint or str(exc)) or attempt == self.USERNAME_ATTEMPTS - 1:
+                    raise
+
+
+class PatientSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user_details = UserSerializer(source='user', read_only=True)
     
     class Meta:
@@ -91,7 +188,7 @@ class PatientSerializer(serializers.ModelSerializer):
         return value
 
 
-class DoctorSerializer(serializers.ModelSerializer):
+class DoctorSerializer(UniqueConstraintErrorsMixin, serializers.ModelSerializer):
     created_by_details = UserSerializer(source='created_by', read_only=True)
     is_approved = serializers.BooleanField(read_only=True)
     
@@ -103,7 +200,14 @@ class DoctorSerializer(serializers.ModelSerializer):
             'created_by', 'created_by_details', 'created_at'
         ]
         read_only_fields = ['created_by', 'is_approved', 'created_at']
-    
+        # Uniqueness is enforced by unique_doctor_license_number; skip DRF's
+        # automatic pre-insert query for it.
+        extra_kwargs = {'license_number': {'validators': []}}
+
+    constraint_errors = {
+        'unique_doctor_license_number': {'license_number': ["License number already exists."]},
+    }
+
     def validate_contact_number(self, value):
         if not value.isdigit() or len(value) < 10:
             raise serializers.ValidationError("Contact number must contain only digits and be at least 10 characters long")
@@ -114,13 +218,8 @@ class DoctorSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Years of experience must be between 0 and 60")
         return value
 
-    def validate_license_number(self, value):
-        if Doctor.objects.filter(license_number=value).exists():
-            raise serializers.ValidationError("License number already exists.")
-        return value
-
 
-class PatientDoctorMappingSerializer(serializers.ModelSerializer):
+class PatientDoctorMappingSerializer(UniqueConstraintErrorsMixin, serializers.ModelSerializer):
     patient_name = serializers.CharField(source='patient.full_name', read_only=True)
     doctor_name = serializers.CharField(source='doctor.full_name', read_only=True)
     doctor_specializations = serializers.ListField(source='doctor.specializations', read_only=True)
@@ -132,8 +231,18 @@ class PatientDoctorMappingSerializer(serializers.ModelSerializer):
             'doctor_specializations', 'created_at'
         ]
         read_only_fields = ['created_at']
+        # unique_patient_doctor is checked by the database on insert.
+        validators = []
+
+    constraint_errors = {
+        'unique_patient_doctor': {'non_field_errors': ["This patient-doctor mapping already exists."]},
+    }
+
 
-    def validate(self, data):
-        if PatientDoctorMapping.objects.filter(patient=data['patient'], doctor=data['doctor']).exists():
-            raise serializers.ValidationError("This patient-doctor mapping already exists.")
-        return data
\ No newline at end of file
+class SystemSettingsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SystemSettings
+        fields = [
+            'auto_logout', 'session_timeout', 'email_notifications',
+            'data_retention', 'max_login_attempts', 'password_min_length',
+        ]
@@ -0,0 +1,34 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import principal_cache
+from .cache import invalidate_doctor_directory
+from .models import CustomUser, Doctor, SystemSettings
+from .system_settings import invalidate_system_settings
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_principal(sender, instance, created=False, **kwargs):
+    # A user that was just created cannot be cached in any process yet.
+    if not created:
+        principal_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_directory_for_creator(sender, instance, created=False, **kwargs):
+    # The doctor directory embeds each doctor's created_by user.
+    if not created and Doctor.objects.filter(created_by_id=instance.pk).exists():
+        invalidate_doctor_directory()
+
+
+@receiver(post_delete, sender=Doctor)
+def invalidate_directory_on_doctor_delete(sender, instance, **kwargs):
+    # Covers doctors removed by cascade when their user or creator is deleted.
+    invalidate_doctor_directory()
+
+
+@receiver(post_save, sender=SystemSettings)
+@receiver(post_delete, sender=SystemSettings)
+def invalidate_cached_system_settings(sender, instance, **kwargs):
+    invalidate_system_settings()
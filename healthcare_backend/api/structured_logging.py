@@ -0,0 +1,176 @@
+"""
+Structured, sampled, non-blocking logging for the ``api`` loggers.
+
+QueueingHandler is referenced from settings.LOGGING. A request thread only
+copies the record onto a bounded queue; a QueueListener thread formats
+each record as one JSON object per line and writes it out. When the queue
+is full, records are dropped and counted rather than blocking the request.
+
+Log structured data as ``extra`` fields rather than interpolating it into
+the message:
+
+    logger.info("User registered", extra={'user_id': user.id, 'role': role})
+
+Any field named in LOGGING_REDACT_FIELDS is replaced by ``[REDACTED]``.
+This includes fields nested in dicts and lists, so PHI such as
+medical_history or contact_number never reaches the log stream.
+Tracebacks are scrubbed too: database key details (``Key (email)=(...)``),
+JWTs, bearer credentials and ``'field': value`` pairs for those fields.
+"""
+import atexit
+import copy
+import datetime
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import re
+from logging.handlers import QueueHandler, QueueListener
+
+REDACTED = '[REDACTED]'
+
+# Attributes every LogRecord has; anything else on a record came from ``extra``.
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'taskName'}
+
+
+def redact(value, fields):
+    """Copy of ``value`` with the values of keys in ``fields`` replaced, at any depth."""
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if str(key).lower() in fields else redact(item, fields)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(item, fields) for item in value]
+    return value
+
+
+# PostgreSQL's "Key (col)=(value)" violation detail, JWTs and Authorization values.
+_KEY_DETAIL = re.compile(r'(Key \(.*?\)=\()(.*?)(\)(?: already exists| is not present)|\)?$)', re.MULTILINE)
+_JWT = re.compile(r'\beyJ[\w-]*\.[\w-]+\.[\w-]+')
+_BEARER = re.compile(r'\b(Bearer|Basic)\s+[\w.~+/=-]+', re.IGNORECASE)
+
+
+def redact_text(text, fields):
+    """Scrub secrets and PHI from free text such as a formatted traceback."""
+    text = _KEY_DETAIL.sub(lambda m: m.group(1) + REDACTED + m.group(3), text)
+    text = _JWT.sub(REDACTED, text)
+    text = _BEARER.sub(lambda m: f'{m.group(1)} {REDACTED}', text)
+    if fields:
+        text = _field_pattern(fields).sub(lambda m: m.group(1) + REDACTED, text)
+    return text
+
+
+@functools.lru_cache(maxsize=8)
+def _field_pattern(fields):
+    # ``'email': 'a@b.c'`` or ``password=hunter2``, but not ``email::text``.
+    names = '|'.join(re.escape(field) for field in sorted(fields))
+    return re.compile(
+        rf"""(['"]?\b(?:{names})\b['"]?\s*(?::(?!:)|=)\s*)('[^']*'|"[^"]*"|[^\s,)}}\]]+)""",
+        re.IGNORECASE,
+    )
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record: timestamp, level, logger, message, extras."""
+
+    def __init__(self, redact_fields=(), **kwargs):
+        super().__init__(**kwargs)
+        self.redact_fields = frozenset(field.lower() for field in redact_fields)
+
+    def format(self, record):
+        entry = {
+            'timestamp': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        extra = {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+        entry.update(redact(extra, self.redact_fields))
+        if record.exc_info and not record.exc_text:
+            record.exc_text = redact_text(self.formatException(record.exc_info), self.redact_fields)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep ``rate`` of the records of each logger in ``rates`` (the longest
+    matching logger prefix wins; unlisted loggers are kept). WARNING and
+    above are always kept.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = sorted((rates or {}).items(), key=lambda item: -len(item[0]))
+
+    def rate_for(self, name):
+        for prefix, rate in self.rates:
+            if name == prefix or name.startswith(prefix + '.'):
+                return rate
+        return 1.0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1 or random.random() < rate
+
+
+class QueueingHandler(QueueHandler):
+    """
+    QueueHandler that owns its QueueListener: records are sampled and
+    queued on the calling thread, and formatted as JSON and written to
+    ``stream`` (stderr by default) on the listener thread.
+
+    A forked child, e.g. a gunicorn worker with preload, starts its own
+    listener because threads do not survive fork().
+    """
+
+    def __init__(self, stream=None, sample_rates=None, redact_fields=(), queue_size=10000):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.queue_size = queue_size
+        self.dropped = 0
+        self.target = logging.StreamHandler(stream)
+        self.target.setFormatter(JSONFormatter(redact_fields=redact_fields))
+        self.addFilter(SamplingFilter(sample_rates))
+        self.listener = None
+        self.start()
+        atexit.register(self.stop)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._restart)
+
+    def start(self):
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self):
+        if self.listener is not None and self.listener._thread is not None:
+            self.listener.stop()
+
+    def _restart(self):
+        # The parent's listener thread did not come along; records queued
+        # before the fork belong to the parent.
+        self.queue = queue.Queue(maxsize=self.queue_size)
+        self.dropped = 0
+        self.start()
+
+    def prepare(self, record):
+        # Resolve the message and traceback now, while args and frames are
+        # still valid, and leave the JSON formatting to the listener.
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            formatter = self.target.formatter
+            record.exc_text = redact_text(formatter.formatException(record.exc_info), formatter.redact_fields)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
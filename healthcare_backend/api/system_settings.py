@@ -0,0 +1,144 @@
+"""
+Process-local cache of the SystemSettings row.
+
+Login, token issue and token validation consult these values on every
+request, so they are served from memory. Saving SystemSettings bumps a
+version key in the shared cache once the transaction commits. Each process
+compares its copy against that key at most every
+SYSTEM_SETTINGS_CHECK_INTERVAL seconds and reloads the row only when the
+version has moved.
+"""
+import threading
+import time
+from datetime import timedelta
+from types import MappingProxyType
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import SystemSettings
+
+SYSTEM_SETTINGS_VERSION_KEY = 'system-settings:version'
+
+SETTING_FIELDS = (
+    'auto_logout', 'session_timeout', 'email_notifications',
+    'data_retention', 'max_login_attempts', 'password_min_length',
+)
+
+
+def default_system_settings():
+    """Values in effect until an admin saves SystemSettings."""
+    defaults = {name: SystemSettings._meta.get_field(name).default for name in SETTING_FIELDS}
+    # Deployments that tuned the login throttle through the environment keep their limit.
+    defaults['max_login_attempts'] = settings.LOGIN_THROTTLE['EMAIL_MAX_FAILURES']
+    return defaults
+
+
+class SystemSettingsCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def _shared_version(self):
+        try:
+            version = cache.get(SYSTEM_SETTINGS_VERSION_KEY)
+            if version is None:
+                # Seeded from the clock, like the doctor directory version, so
+                # an evicted key never rolls back to a version seen before.
+                cache.add(SYSTEM_SETTINGS_VERSION_KEY, time.time_ns() // 1000, timeout=None)
+                version = cache.get(SYSTEM_SETTINGS_VERSION_KEY)
+            return version
+        except Exception:
+            # Without the shared cache, fall back to re-reading the row.
+            return None
+
+    def _load(self):
+        row = SystemSettings.objects.filter(pk=SystemSettings.SINGLETON_ID).values(*SETTING_FIELDS).first()
+        return MappingProxyType({**default_system_settings(), **(row or {})})
+
+    def current(self):
+        """The cached values if checked within the interval, else None."""
+        values = self._values
+        if values is not None and time.monotonic() - self._checked_at < settings.SYSTEM_SETTINGS_CHECK_INTERVAL:
+            return values
+        return None
+
+    def get(self):
+        values = self.current()
+        if values is not None:
+            return values
+        with self._lock:
+            # Read the version before the row: a save committing in between
+            # then shows up as a newer version on the next check.
+            version = self._shared_version()
+            if self._values is None or version is None or version != self._version:
+                self._values = self._load()
+                self._version = version
+            self._checked_at = time.monotonic()
+            return self._values
+
+    def invalidate(self):
+        try:
+            cache.incr(SYSTEM_SETTINGS_VERSION_KEY)
+        except ValueError:
+            self._shared_version()
+        except Exception:
+            pass
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._values = None
+            self._version = None
+
+
+system_settings_cache = SystemSettingsCache()
+
+
+def get_system_settings():
+    """The current settings as a read-only mapping of SETTING_FIELDS."""
+    return system_settings_cache.get()
+
+
+async def aget_system_settings():
+    """get_system_settings() for async code; a reload runs in a worker thread."""
+    values = system_settings_cache.current()
+    if values is None:
+        values = await sync_to_async(system_settings_cache.get)()
+    return values
+
+
+def invalidate_system_settings():
+    """Call after SystemSettings changes; other processes follow within the check interval."""
+    transaction.on_commit(system_settings_cache.invalidate)
+
+
+def access_token_lifetime(current=None):
+    """
+    SIMPLE_JWT's access lifetime, but never longer than session_timeout.
+    Async callers pass ``current`` from aget_system_settings().
+    """
+    current = current or get_system_settings()
+    return min(api_settings.ACCESS_TOKEN_LIFETIME, timedelta(minutes=current['session_timeout']))
+
+
+def refresh_token_lifetime():
+    """session_timeout with auto_logout (the session ends when idle), else SIMPLE_JWT's."""
+    current = get_system_settings()
+    if current['auto_logout']:
+        return timedelta(minutes=current['session_timeout'])
+    return api_settings.REFRESH_TOKEN_LIFETIME
+
+
+@receiver(setting_changed)
+def _clear_on_setting_changed(setting, **kwargs):
+    if setting in ('LOGIN_THROTTLE', 'SYSTEM_SETTINGS_CHECK_INTERVAL'):
+        system_settings_cache.clear()
@@ -0,0 +1,64 @@
+import time
+
+from celery import current_app
+from celery.signals import task_failure, task_postrun, task_prerun, task_retry
+from django.core.cache import cache
+
+METRICS_PREFIX = 'task-metrics'
+METRIC_NAMES = ('started', 'succeeded', 'failed', 'retried', 'runtime_ms')
+METRICS_TIMEOUT = 7 * 24 * 3600
+
+# task_id -> perf_counter() at start, for the tasks running in this worker.
+_started = {}
+
+
+def _incr(task_name, metric, amount=1):
+    key = f'{METRICS_PREFIX}:{task_name}:{metric}'
+    # Metrics must never fail a task, e.g. when Redis is briefly away.
+    try:
+        cache.add(key, 0, timeout=METRICS_TIMEOUT)
+        cache.incr(key, amount)
+    except Exception:
+        pass
+
+
+@task_prerun.connect
+def _on_prerun(task_id=None, task=None, **kwargs):
+    _started[task_id] = time.perf_counter()
+    _incr(task.name, 'started')
+
+
+@task_postrun.connect
+def _on_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _started.pop(task_id, None)
+    if started is not None:
+        _incr(task.name, 'runtime_ms', int((time.perf_counter() - started) * 1000))
+    if state == 'SUCCESS':
+        _incr(task.name, 'succeeded')
+
+
+@task_failure.connect
+def _on_failure(sender=None, **kwargs):
+    _incr(sender.name, 'failed')
+
+
+@task_retry.connect
+def _on_retry(sender=None, **kwargs):
+    _incr(sender.name, 'retried')
+
+
+def get_task_metrics(task_names=None):
+    """
+    Return ``{task_name: {metric: value}}`` for the api tasks, read from the
+    shared cache so the numbers cover every worker.
+    """
+    if task_names is None:
+        task_names = sorted(name for name in current_app.tasks if name.startswith('api.'))
+    keys = [f'{METRICS_PREFIX}:{name}:{metric}' for name in task_names for metric in METRIC_NAMES]
+    values = cache.get_many(keys)
+    return {
+        name: {
+            metric: values.get(f'{METRICS_PREFIX}:{name}:{metric}', 0) for metric in METRIC_NAMES
+        }
+        for name in task_names
+    }
@@ -1,12 +1,100 @@
+import logging
+from smtplib import SMTPException
+
 from celery import shared_task
-from django.core.mail import send_mail
-
-@shared_task
-def send_welcome_email(email):
-    send_mail(
-        subject="Welcome to the Healthcare System",
-        message="Thank you for registering with us!",
-        from_email="aadityasoni901@gmail.com",
-        recipient_list=[email],
-        fail_silently=False,
+from celery.utils.time import get_exponential_backoff_interval
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+from . import task_metrics  # noqa: F401  connects the metrics signal handlers
+from .models import CustomUser, Doctor
+
+audit_logger = logging.getLogger('api.audit')
+
+DEFAULT_SENDER = "aadityasoni901@gmail.com"
+
+# Registration side effects are not worth failing a signup over, so they
+# run after commit and retry transient SMTP/network errors with backoff.
+RETRY_POLICY = {
+    'autoretry_for': (SMTPException, OSError),
+    'retry_backoff': True,
+    'retry_backoff_max': 600,
+    'retry_jitter': True,
+    'max_retries': 5,
+}
+
+
+@shared_task(bind=True, max_retries=5, rate_limit=settings.EMAIL_TASK_RATE_LIMIT)
+def send_email_batch(self, messages):
+    """
+    Send ``messages`` (dicts with subject, message, recipient_list and
+    optionally from_email) over one SMTP connection.
+
+    If a send fails, the task retries with exponential backoff, and only
+    with the messages that were not delivered yet.
+    """
+    connection = get_connection(fail_silently=False)
+    sent = 0
+    try:
+        connection.open()
+        for message in messages:
+            EmailMessage(
+                subject=message['subject'],
+                body=message['message'],
+                from_email=message.get('from_email', DEFAULT_SENDER),
+                to=message['recipient_list'],
+                connection=connection,
+            ).send()
+            sent += 1
+    except (SMTPException, OSError) as exc:
+        countdown = get_exponential_backoff_interval(
+            factor=1, retries=self.request.retries, maximum=600, full_jitter=True
+        )
+        raise self.retry(args=(messages[sent:],), exc=exc, countdown=countdown)
+    finally:
+        connection.close()
+    return sent
+
+
+def queue_emails(messages, batch_size=None, queue=None):
+    """
+    Split ``messages`` into batches of EMAIL_BATCH_SIZE and queue each one.
+    All outgoing email goes through here, so every batch is sent over one
+    SMTP connection. ``queue`` overrides the send_email_batch route.
+    """
+    batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+    options = {'queue': queue} if queue else {}
+    for start in range(0, len(messages), batch_size):
+        send_email_batch.apply_async(args=(messages[start:start + batch_size],), **options)
+
+
+def welcome_email(email):
+    return {
+        'subject': "Welcome to the Healthcare System",
+        'message': "Thank you for registering with us!",
+        'recipient_list': [email],
+    }
+
+
+@shared_task(**RETRY_POLICY)
+def notify_admins_of_pending_doctor(doctor_id):
+    """Email every active admin, one message each, in as few SMTP connections as EMAIL_BATCH_SIZE allows."""
+    doctor = Doctor.objects.filter(pk=doctor_id).values('full_name', 'license_number', 'is_approved').first()
+    if doctor is None or doctor['is_approved']:
+        return
+    recipients = list(
+        CustomUser.objects.filter(role='admin', is_active=True).values_list('email', flat=True)
+    )
+    message = (
+        f"{doctor['full_name']} (license {doctor['license_number'] or 'not provided'}) "
+        "has registered and is waiting for approval."
     )
+    queue_emails([
+        {'subject': "Doctor registration pending approval", 'message': message, 'recipient_list': [recipient]}
+        for recipient in recipients
+    ], queue='high')
+
+
+@shared_task(**RETRY_POLICY)
+def record_audit_event(action, user_id, details=None):
+    audit_logger.info(action, extra={'action': action, 'user_id': user_id, 'details': details or {}})
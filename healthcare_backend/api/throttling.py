@@ -0,0 +1,125 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .system_settings import get_system_settings
+
+
+class LoginThrottle:
+    """
+    Fixed-window limits on login attempts, checked before any password
+    hashing happens.
+
+    Two limits apply per window: failed attempts per email address, and
+    attempts of any outcome per client IP (credential stuffing spreads over
+    many emails from few addresses). Counters live in the shared Django
+    cache (Redis in production) so all workers see the same totals. Once a
+    key is over its limit this process also remembers it in memory until
+    the window ends, so a burst is rejected without a cache round trip;
+    at most LOCAL_MAX_BLOCKED keys are remembered, the cache covers the rest.
+    """
+
+    def __init__(self, email_max_failures=None, ip_max_attempts=None, window=None):
+        self._email_max_failures = email_max_failures
+        self._ip_max_attempts = ip_max_attempts
+        self._window = window
+        self._blocked = {}
+        self._lock = threading.Lock()
+
+    def _config(self, name, override):
+        if override is not None:
+            return override
+        return settings.LOGIN_THROTTLE[name]
+
+    @property
+    def email_max_failures(self):
+        # Admins change this at runtime through SystemSettings.max_login_attempts.
+        if self._email_max_failures is not None:
+            return self._email_max_failures
+        return get_system_settings()['max_login_attempts']
+
+    @property
+    def ip_max_attempts(self):
+        return self._config('IP_MAX_ATTEMPTS', self._ip_max_attempts)
+
+    @property
+    def window(self):
+        return self._config('WINDOW_SECONDS', self._window)
+
+    @property
+    def local_max_blocked(self):
+        return settings.LOGIN_THROTTLE.get('LOCAL_MAX_BLOCKED', 10000)
+
+    def _keys(self, email, ip):
+        window_id = int(time.time() // self.window)
+        # Hash the email so addresses do not end up in Redis key names.
+        digest = hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+        return f'login-throttle:email:{digest}:{window_id}', f'login-throttle:ip:{ip}:{window_id}'
+
+    def _retry_after(self):
+        return int(self.window - time.time() % self.window) + 1
+
+    def _block_locally(self, key):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._blocked) >= self.local_max_blocked:
+                self._blocked = {k: until for k, until in self._blocked.items() if until >= now}
+                if len(self._blocked) >= self.local_max_blocked:
+                    return
+            self._blocked[key] = now + self._retry_after()
+
+    def _blocked_locally(self, key):
+        with self._lock:
+            until = self._blocked.get(key)
+            if until is None:
+                return False
+            if until < time.monotonic():
+                del self._blocked[key]
+                return False
+            return True
+
+    def _incr(self, key):
+        cache.add(key, 0, timeout=self.window)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr(); start the count again.
+            cache.set(key, 1, timeout=self.window)
+            return 1
+
+    def check(self, email, ip):
+        """
+        Count this attempt against the IP and return the number of seconds
+        to wait if the caller is over a limit, otherwise None.
+        """
+        email_key, ip_key = self._keys(email, ip)
+        if self._blocked_locally(email_key) or self._blocked_locally(ip_key):
+            return self._retry_after()
+
+        failures = cache.get(email_key, 0)
+        if failures >= self.email_max_failures:
+            self._block_locally(email_key)
+            return self._retry_after()
+        if self._incr(ip_key) > self.ip_max_attempts:
+            self._block_locally(ip_key)
+            return self._retry_after()
+        return None
+
+    def record_failure(self, email, ip):
+        email_key, _ = self._keys(email, ip)
+        if self._incr(email_key) >= self.email_max_failures:
+            self._block_locally(email_key)
+
+    def reset(self, email, ip):
+        email_key, _ = self._keys(email, ip)
+        cache.delete(email_key)
+
+    def clear(self):
+        with self._lock:
+            self._blocked.clear()
+
+
+login_throttle = LoginThrottle()
@@ -1,16 +1,26 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     RegisterView, UserProfileView, UserListView, UserDetailView,
-    PatientListCreateView, PatientDetailView,
+    PatientListCreateView, PatientDetailView, PatientImportView, PatientExportView,
     DoctorListCreateView, DoctorDetailView,
     PatientDoctorMappingListCreateView, PatientDoctorMappingDetailView, 
-    PatientDoctorByPatientView,
+    PatientDoctorByPatientView, MappingExportView,
     ChangePasswordView, SystemSettingsView, UserActivityView,
     DoctorSelfPatientsView, DoctorMapPatientView,
-    health_check, LoginView, DoctorApprovalView, PendingDoctorsView
+    health_check, LoginView, DoctorApprovalView, PendingDoctorsView, MetricsView
 )
 from rest_framework_simplejwt.views import TokenRefreshView
 
+if settings.ASYNC_VIEWS:
+    # Opt-in async GET handlers for the read-heavy endpoints (ASGI only).
+    from .async_views import (
+        AsyncDoctorListView as DoctorListCreateView,
+        AsyncMappingListView as PatientDoctorMappingListCreateView,
+        AsyncPatientDetailView as PatientDetailView,
+        AsyncUserProfileView as UserProfileView,
+    )
+
 urlpatterns = [
     path('health/', health_check, name='health_check'),
 
@@ -28,9 +38,17 @@ urlpatterns = [
     # System settings (admin only)
     path('v1/system-settings/', SystemSettingsView.as_view(), name='system-settings'),
 
+    # Activity log (admin only)
+    path('v1/user-activity/', UserActivityView.as_view(), name='user-activity'),
+
+    # Request and task metrics (admin only)
+    path('v1/metrics/', MetricsView.as_view(), name='metrics'),
+
     # Patient endpoints
     path('v1/patients/', PatientListCreateView.as_view(), name='patient-list-create'),
     path('v1/patients/<int:pk>/', PatientDetailView.as_view(), name='patient-detail'),
+    path('v1/patients/import/', PatientImportView.as_view(), name='patient-import'),
+    path('v1/patients/export/', PatientExportView.as_view(), name='patient-export'),
 
     # Doctor endpoints
     path('v1/doctors/', DoctorListCreateView.as_view(), name='doctor-list-create'),
@@ -40,6 +58,7 @@ urlpatterns = [
 
     # Patient-Doctor Mapping endpoints
     path('v1/mappings/', PatientDoctorMappingListCreateView.as_view(), name='mapping-list-create'),
+    path('v1/mappings/export/', MappingExportView.as_view(), name='mapping-export'),
     path('v1/mappings/<int:pk>/', PatientDoctorMappingDetailView.as_view(), name='mapping-detail'),
     path('v1/mappings/patient/<int:patient_id>/', PatientDoctorByPatientView.as_view(), name='mapping-by-patient'),
 
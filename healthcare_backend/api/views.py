@@ -1,18 +1,80 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import serializers, status
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework.decorators import api_view
-from django.db.models import Q
-from django.core.exceptions import PermissionDenied
-from .models import Patient, Doctor, PatientDoctorMapping, CustomUser
-from .serializers import PatientSerializer, RegisterSerializer, DoctorSerializer, PatientDoctorMappingSerializer, UserSerializer
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.throttling import BaseThrottle
+from rest_framework.settings import api_settings
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, Max, OuterRef
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import urlencode
+from django.core.exceptions import PermissionDenied, ValidationError as DjangoValidationError
+from django.http import StreamingHttpResponse
+from .models import ActivityEvent, Patient, Doctor, PatientDoctorMapping, CustomUser, SystemSettings
+from .serializers import (
+    PatientSerializer, RegisterSerializer, DoctorSerializer, PatientDoctorMappingSerializer, UserSerializer,
+    SystemSettingsSerializer,
+)
+from .row_serializers import (
+    ActivityEventRowSerializer, DoctorRowSerializer, PatientDoctorMappingRowSerializer, PatientRowSerializer,
+    UserRowSerializer,
+)
 from .premissions import IsAdmin, IsOwnerOrAdmin, IsCreatorOrAdmin
+from .pagination import KeysetPagination
+from .authentication import HealthcareRefreshToken, token_claim
+from .cache import doctor_directory_version, get_doctor_directory, invalidate_doctor_directory
+from .conditional import conditional_response, make_etag, user_version
+from .activity import record_activity
+from .system_settings import default_system_settings, get_system_settings
+from .throttling import login_throttle
+from .tasks import notify_admins_of_pending_doctor, queue_emails, record_audit_event, welcome_email
+from .exporters import (
+    EXPORT_FORMATS, MAPPING_EXPORT_COLUMNS, PATIENT_EXPORT_COLUMNS, parse_columns, stream_export
+)
+from .importers import (
+    ImportFormatError, PatientImporter, check_encoding, detect_format, iter_rows, iter_text_lines
+)
+from .instrumentation import request_metrics_report
+from .renderers import PrometheusRenderer
+from .task_metrics import get_task_metrics
 from django.contrib.auth import update_session_auth_hash
+from django.contrib.auth.password_validation import validate_password
+from datetime import timedelta
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def mapping_queryset():
+    """
+    Mapping ``.values()`` rows joined with the patient and doctor columns
+    that PatientDoctorMappingRowSerializer reads, plus the updated_at
+    stamps for the page validators, so a page costs one query.
+    """
+    return PatientDoctorMappingRowSerializer().values(
+        PatientDoctorMapping.objects.all(), 'updated_at', 'patient__updated_at', 'doctor__updated_at'
+    )
+
+
+def mapping_page_etag(request, paginator, page):
+    """
+    ETag for one page of mapping_queryset() rows. The row ids catch
+    deletions; a newest-updated_at Last-Modified would not, so none is sent.
+    """
+    stamps = [
+        (row['id'], row['updated_at'], row['patient__updated_at'], row['doctor__updated_at'])
+        for row in page
+    ]
+    return make_etag('mappings', request.user.pk, request.get_full_path(), paginator.next_position, stamps)
 
 
 @api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
 def health_check(request):
     """
     Health check endpoint for Docker
@@ -20,60 +82,69 @@ def health_check(request):
     return Response({"status": "healthy", "service": "healthcare_backend"}, status=status.HTTP_200_OK)
 
 
+def schedule_registration_tasks(user, doctor_id=None):
+    """
+    Queue the non-critical registration work to run once the signup has
+    committed. ``robust`` keeps a broker outage from failing the request.
+    """
+    transaction.on_commit(lambda: queue_emails([welcome_email(user.email)]), robust=True)
+    if doctor_id is not None:
+        transaction.on_commit(lambda: notify_admins_of_pending_doctor.delay(doctor_id), robust=True)
+    transaction.on_commit(
+        lambda: record_audit_event.delay('user.registered', user.id, {'role': user.role}), robust=True
+    )
+    transaction.on_commit(lambda: record_activity(user.id, 'registration', details={'role': user.role}))
+
+
 class RegisterView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
-        print("=== REGISTRATION REQUEST DATA ===")
-        print(f"Raw data: {request.data}")
-        print("=================================")
-        
         serializer = RegisterSerializer(data=request.data)
         
         if serializer.is_valid():
-            print("Serializer is valid")
-            role = request.data.get('role', 'user')
-            print(f"Creating user with role: {role}")
-            
+            role = serializer.validated_data.get('role', 'user')
+
             try:
-                user = serializer.save()
-                user.role = role
-                
-                # For doctors, set is_active to False until approved by admin
-                if role == 'doctor':
-                    user.is_active = False
-                
-                user.save()
-                print(f"User created: {user.username}, role: {user.role}")
-
-                # Create role-specific profile
-                if role == 'patient':
-                    patient = Patient.objects.create(
-                        user=user,
-                        full_name=request.data.get('full_name', f"{user.first_name} {user.last_name}"),
-                        email=user.email,
-                        age=request.data.get('age', 0),
-                        gender=request.data.get('gender', 'Other'),
-                        contact_number=request.data.get('contact_number', ''),
-                        medical_history=request.data.get('medical_history', '')
-                    )
-                    print(f"Patient profile created: {patient}")
-                    
-                elif role == 'doctor':
-                    doctor = Doctor.objects.create(
-                        user=user,
-                        full_name=request.data.get('full_name', f"{user.first_name} {user.last_name}"),
-                        email=user.email,
-                        specializations=request.data.get('specializations', []),
-                        license_number=request.data.get('license_number', ''),
-                        years_of_experience=request.data.get('years_of_experience', 0),
-                        contact_number=request.data.get('contact_number', ''),
-                        is_approved=False,
-                        created_by=user
-                    )
-                    print(f"Doctor profile created: {doctor}")
+                # The user and its profile commit together, with the user
+                # written once; everything else runs on Celery afterwards.
+                with transaction.atomic():
+                    # For doctors, set is_active to False until approved by admin
+                    user = serializer.save(is_active=role != 'doctor')
+
+                    # Create role-specific profile
+                    profile_id = None
+                    if role == 'patient':
+                        patient = Patient.objects.create(
+                            user=user,
+                            full_name=request.data.get('full_name', f"{user.first_name} {user.last_name}"),
+                            email=user.email,
+                            age=request.data.get('age', 0),
+                            gender=request.data.get('gender', 'Other'),
+                            contact_number=request.data.get('contact_number', ''),
+                            medical_history=request.data.get('medical_history', '')
+                        )
+                        profile_id = patient.id
+
+                    elif role == 'doctor':
+                        doctor = Doctor.objects.create(
+                            user=user,
+                            full_name=request.data.get('full_name', f"{user.first_name} {user.last_name}"),
+                            email=user.email,
+                            specializations=request.data.get('specializations', []),
+                            license_number=request.data.get('license_number', ''),
+                            years_of_experience=request.data.get('years_of_experience', 0),
+                            contact_number=request.data.get('contact_number', ''),
+                            is_approved=False,
+                            created_by=user
+                        )
+                        profile_id = doctor.id
+
+                    schedule_registration_tasks(user, doctor_id=profile_id if role == 'doctor' else None)
 
-                refresh = RefreshToken.for_user(user)
+                logger.info("User registered", extra={'user_id': user.id, 'role': role, 'profile_id': profile_id})
+
+                refresh = HealthcareRefreshToken.for_user(user, profile_id=profile_id)
                 return Response({
                     'refresh': str(refresh),
                     'access': str(refresh.access_token),
@@ -81,17 +152,17 @@ class RegisterView(APIView):
                     'message': 'Registration successful. ' + 
                               ('Your account is pending admin approval.' if role == 'doctor' else '')
                 }, status=status.HTTP_201_CREATED)
-                
+
+            except serializers.ValidationError as e:
+                return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
             except Exception as e:
-                print(f"Error during user creation: {str(e)}")
+                logger.exception("Registration failed", extra={'role': role})
                 return Response(
                     {"error": f"User creation failed: {str(e)}"},
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
         else:
-            print("=== SERIALIZER ERRORS ===")
-            print(f"Errors: {serializer.errors}")
-            print("=========================")
+            logger.info("Registration rejected", extra={'invalid_fields': sorted(serializer.errors)})
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -99,8 +170,6 @@ class LoginView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
-        from django.contrib.auth import authenticate
-        
         email = request.data.get('email')
         password = request.data.get('password')
         
@@ -109,41 +178,70 @@ class LoginView(APIView):
                 {"error": "Email and password are required"}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        try:
-            user = CustomUser.objects.get(email=email)
-            user = authenticate(username=user.username, password=password)
-            
-            if user is not None:
-                # Check if doctor is approved
-                if user.role == 'doctor':
-                    try:
-                        doctor = Doctor.objects.get(user=user)
-                        if not doctor.is_approved:
-                            return Response(
-                                {"error": "Your account is pending admin approval"},
-                                status=status.HTTP_403_FORBIDDEN
-                            )
-                    except Doctor.DoesNotExist:
-                        pass
-                
-                refresh = RefreshToken.for_user(user)
-                return Response({
-                    'refresh': str(refresh),
-                    'access': str(refresh.access_token),
-                    'user': UserSerializer(user).data
-                }, status=status.HTTP_200_OK)
-            else:
-                return Response(
-                    {"error": "Invalid credentials"}, 
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
-                
-        except CustomUser.DoesNotExist:
+        if not isinstance(email, str) or not isinstance(password, str):
+            return Response(
+                {"error": "Email and password must be strings"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Throttle before hashing anything, so a credential-stuffing burst
+        # is turned away without spending CPU on PBKDF2.
+        client_ip = BaseThrottle().get_ident(request)
+        retry_after = login_throttle.check(email, client_ip)
+        if retry_after is not None:
+            return Response(
+                {"error": "Too many login attempts. Please try again later."},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={'Retry-After': str(retry_after)}
+            )
+
+        # One query for the user and the doctor profile. Matching on
+        # LOWER(email) uses the unique_custom_user_email index.
+        user = (
+            CustomUser.objects.select_related('doctor_profile')
+            .annotate(email_lower=Lower('email'))
+            .filter(email_lower=email.strip().lower())
+            .first()
+        )
+        if user is None:
+            # Hash anyway so response time does not reveal unknown emails.
+            CustomUser().set_password(password)
+        if user is None or not user.check_password(password):
+            login_throttle.record_failure(email, client_ip)
             return Response(
                 {"error": "Invalid credentials"}, 
                 status=status.HTTP_401_UNAUTHORIZED
             )
+        login_throttle.reset(email, client_ip)
+
+        # Check if doctor is approved
+        profile_id = None
+        if user.role == 'doctor':
+            try:
+                doctor = user.doctor_profile
+            except Doctor.DoesNotExist:
+                doctor = None
+            if doctor is not None:
+                if not doctor.is_approved:
+                    return Response(
+                        {"error": "Your account is pending admin approval"},
+                        status=status.HTTP_403_FORBIDDEN
+                    )
+                profile_id = doctor.id
+
+        if not user.is_active:
+            return Response(
+                {"error": "Invalid credentials"}, 
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        record_activity(user.id, 'login')
+        refresh = HealthcareRefreshToken.for_user(user, profile_id=profile_id)
+        return Response({
+            'refresh': str(refresh),
+            'access': str(refresh.access_token),
+            'user': UserSerializer(user).data
+        }, status=status.HTTP_200_OK)
 
 
 class UserProfileView(APIView):
@@ -152,19 +250,23 @@ class UserProfileView(APIView):
     def get(self, request):
         user_data = UserSerializer(request.user).data
 
-        # Include role-specific data
+        # Include role-specific data. The access token names the profile, so
+        # it is fetched by primary key instead of searched for by user.
+        profile_id = token_claim(request, 'profile_id')
         if request.user.role == 'patient':
-            try:
-                patient = Patient.objects.get(user=request.user)
-                user_data['profile'] = PatientSerializer(patient).data
-            except Patient.DoesNotExist:
-                user_data['profile'] = None
+            patients = Patient.objects.filter(user=request.user)
+            if profile_id:
+                patients = patients.filter(pk=profile_id)
+            patient = patients.first()
+            if patient:
+                patient.user = request.user
+            user_data['profile'] = PatientSerializer(patient).data if patient else None
         elif request.user.role == 'doctor':
-            try:
-                doctor = Doctor.objects.get(user=request.user)
-                user_data['profile'] = DoctorSerializer(doctor).data
-            except Doctor.DoesNotExist:
-                user_data['profile'] = None
+            doctors = Doctor.objects.filter(user=request.user).select_related('created_by')
+            if profile_id:
+                doctors = doctors.filter(pk=profile_id)
+            doctor = doctors.first()
+            user_data['profile'] = DoctorSerializer(doctor).data if doctor else None
         else:
             user_data['profile'] = None
 
@@ -180,8 +282,8 @@ class PatientListCreateView(APIView):
         else:
             patients = Patient.objects.filter(user=request.user)
 
-        serializer = PatientSerializer(patients, many=True)
-        return Response(serializer.data)
+        rows = PatientRowSerializer()
+        return Response(rows.serialize(rows.values(patients)))
 
     def post(self, request):
         serializer = PatientSerializer(data=request.data)
@@ -194,12 +296,96 @@ class PatientListCreateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class PatientImportView(APIView):
+    """
+    Admin endpoint to bulk-import patients from a CSV or NDJSON upload.
+
+    The file is imported within the request, so uploads are capped at
+    PATIENT_IMPORT_MAX_BYTES; the import_patients command has no limit.
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "file is required"}, status=status.HTTP_400_BAD_REQUEST)
+        if upload.size > settings.PATIENT_IMPORT_MAX_BYTES:
+            return Response(
+                {"error": (
+                    f"File is larger than {settings.PATIENT_IMPORT_MAX_BYTES} bytes. "
+                    "Import it with `python manage.py import_patients <path> --owner <user>` instead."
+                )},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+
+        try:
+            file_format = detect_format(upload.name, request.data.get('file_format'))
+            importer = PatientImporter(
+                default_user=request.user,
+                method=request.data.get('method', 'bulk_create'),
+            )
+            check_encoding(upload)
+        except (ImportFormatError, ValueError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        report = importer.run(iter_rows(iter_text_lines(upload), file_format))
+
+        if report['created']:
+            response_status = status.HTTP_201_CREATED
+        elif report['failed']:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_200_OK
+        return Response(report, status=response_status)
+
+
+class StreamingExportView(APIView):
+    """
+    Base for admin exports streamed as CSV or NDJSON.
+
+    ``?file_format=csv|ndjson`` picks the format (default csv) and
+    ``?columns=a,b,c`` the columns, in order.
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+    columns = {}
+    filename = 'export'
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def get(self, request):
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"file_format must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        columns, error = parse_columns(request.query_params.get('columns'), self.columns)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            stream_export(self.get_queryset(), columns, file_format),
+            content_type=EXPORT_FORMATS[file_format],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{self.filename}.{file_format}"'
+        return response
+
+
+class PatientExportView(StreamingExportView):
+    columns = PATIENT_EXPORT_COLUMNS
+    filename = 'patients'
+
+    def get_queryset(self):
+        return Patient.objects.order_by('id')
+
+
 class PatientDetailView(APIView):
     permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
 
     def get_object(self, pk):
         try:
-            patient = Patient.objects.get(pk=pk)
+            patient = Patient.objects.select_related('user').get(pk=pk)
             self.check_object_permissions(self.request, patient)
             return patient
         except Patient.DoesNotExist:
@@ -209,8 +395,12 @@ class PatientDetailView(APIView):
         patient = self.get_object(pk)
         if not patient:
             return Response({"error": "Patient not found"}, status=status.HTTP_404_NOT_FOUND)
-        serializer = PatientSerializer(patient)
-        return Response(serializer.data)
+        record_activity(request.user.id, 'patient.viewed', 'patient', patient.pk)
+        return conditional_response(
+            request,
+            lambda: Response(PatientSerializer(patient).data),
+            etag=make_etag('patient', patient.pk, patient.updated_at, user_version(patient.user)),
+        )
 
     def put(self, request, pk):
         patient = self.get_object(pk)
@@ -230,18 +420,80 @@ class PatientDetailView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+def parse_doctor_filters(query_params):
+    """
+    Translate ``?specialization=Cardiology&min_experience=5`` into ORM filters.
+
+    ``specialization`` may be repeated; a doctor must have all of them. The
+    JSON containment lookup is served by the GIN index on specializations.
+    Returns ``(filters, error)``.
+    """
+    filters = {}
+    specializations = sorted(set(query_params.getlist('specialization')))
+    if specializations:
+        valid = {choice for choice, _ in Doctor.SPECIALIZATION_CHOICES}
+        unknown = [s for s in specializations if s not in valid]
+        if unknown:
+            return None, f"Unknown specialization: {', '.join(unknown)}"
+        filters['specializations__contains'] = specializations
+
+    min_experience = query_params.get('min_experience')
+    if min_experience is not None:
+        try:
+            min_experience = int(min_experience)
+        except ValueError:
+            return None, "min_experience must be an integer"
+        if min_experience < 0:
+            return None, "min_experience must not be negative"
+        filters['years_of_experience__gte'] = min_experience
+
+    return filters, None
+
+
+def doctor_directory_variant(filters):
+    """Cache key suffix identifying one filtered view of the directory."""
+    return urlencode(sorted(
+        (key, ','.join(value) if isinstance(value, list) else value)
+        for key, value in filters.items()
+    ))
+
+
 class DoctorListCreateView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
+        filters, error = parse_doctor_filters(request.query_params)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
         if request.user.role == 'admin':
-            doctors = Doctor.objects.all()
-        else:
-            # Only show approved doctors to non-admin users
-            doctors = Doctor.objects.filter(is_approved=True)
+            doctors = Doctor.objects.filter(**filters)
+            rows = DoctorRowSerializer()
+            # Count catches deletions, the newest updated_at doctor edits and
+            # the directory version edits to the embedded created_by users.
+            summary = doctors.aggregate(count=Count('id'), updated_at=Max('updated_at'))
+            return conditional_response(
+                request,
+                lambda: Response(rows.serialize(rows.values(doctors))),
+                etag=make_etag(
+                    'doctors', request.get_full_path(), summary['count'], summary['updated_at'],
+                    doctor_directory_version(),
+                ),
+            )
 
-        serializer = DoctorSerializer(doctors, many=True)
-        return Response(serializer.data)
+        # Only show approved doctors to non-admin users. Every patient reads
+        # this directory and it rarely changes, so it is served from cache.
+        def build():
+            rows = DoctorRowSerializer()
+            return rows.serialize(rows.values(Doctor.objects.filter(is_approved=True, **filters)))
+
+        variant = doctor_directory_variant(filters)
+        return conditional_response(
+            request,
+            lambda: Response(get_doctor_directory(build, variant=variant)),
+            # Every change to a doctor bumps the directory version.
+            etag=make_etag('doctor-directory', doctor_directory_version(), variant),
+        )
 
     def post(self, request):
         if request.user.role != 'admin':
@@ -252,6 +504,7 @@ class DoctorListCreateView(APIView):
         serializer = DoctorSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save(created_by=request.user)
+            invalidate_doctor_directory()
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -261,7 +514,7 @@ class DoctorDetailView(APIView):
 
     def get_object(self, pk):
         try:
-            doctor = Doctor.objects.get(pk=pk)
+            doctor = Doctor.objects.select_related('created_by').get(pk=pk)
             # Non-admin users can only see approved doctors
             if not doctor.is_approved and self.request.user.role != 'admin':
                 return None
@@ -273,8 +526,11 @@ class DoctorDetailView(APIView):
         doctor = self.get_object(pk)
         if not doctor:
             return Response({"error": "Doctor not found"}, status=status.HTTP_404_NOT_FOUND)
-        serializer = DoctorSerializer(doctor)
-        return Response(serializer.data)
+        return conditional_response(
+            request,
+            lambda: Response(DoctorSerializer(doctor).data),
+            etag=make_etag('doctor', doctor.pk, doctor.updated_at, user_version(doctor.created_by)),
+        )
 
     def put(self, request, pk):
         doctor = self.get_object(pk)
@@ -290,6 +546,7 @@ class DoctorDetailView(APIView):
         serializer = DoctorSerializer(doctor, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            invalidate_doctor_directory()
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -304,6 +561,7 @@ class DoctorDetailView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
         doctor.delete()
+        invalidate_doctor_directory()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -329,7 +587,9 @@ class DoctorApprovalView(APIView):
             if doctor.user:
                 doctor.user.is_active = is_approved
                 doctor.user.save()
-            
+
+            invalidate_doctor_directory()
+
             action = "approved" if is_approved else "rejected"
             return Response(
                 {"message": f"Doctor {action} successfully"},
@@ -348,29 +608,31 @@ class PendingDoctorsView(APIView):
     permission_classes = [IsAuthenticated, IsAdmin]
 
     def get(self, request):
-        pending_doctors = Doctor.objects.filter(is_approved=False)
-        serializer = DoctorSerializer(pending_doctors, many=True)
-        return Response(serializer.data)
+        rows = DoctorRowSerializer()
+        return Response(rows.serialize(rows.values(Doctor.objects.filter(is_approved=False))))
 
 
 class PatientDoctorMappingListCreateView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        if request.user.role == 'admin':
-            mappings = PatientDoctorMapping.objects.all()
-        elif request.user.role == 'doctor':
-            mappings = PatientDoctorMapping.objects.filter(doctor__user=request.user)
-        else:
-            mappings = PatientDoctorMapping.objects.filter(patient__user=request.user)
-        
-        serializer = PatientDoctorMappingSerializer(mappings, many=True)
-        return Response(serializer.data)
+        mappings = mapping_queryset()
+        if request.user.role == 'doctor':
+            mappings = mappings.filter(doctor__user=request.user)
+        elif request.user.role != 'admin':
+            mappings = mappings.filter(patient__user=request.user)
+
+        # Keyset pagination on (created_at, id): constant cost per page
+        # regardless of how deep into the table the client has scrolled.
+        paginator = KeysetPagination(ordering=('-created_at', '-id'))
+        page = paginator.paginate_queryset(mappings, request, view=self)
+        return conditional_response(
+            request,
+            lambda: paginator.get_paginated_response(PatientDoctorMappingRowSerializer().serialize(page)),
+            etag=mapping_page_etag(request, paginator, page),
+        )
 
     def post(self, request):
-        print(f"User: {request.user}, Role: {request.user.role}")
-        print(f"Request data: {request.data}")
-
         # Allow both admins and doctors to create mappings
         if request.user.role not in ['admin', 'doctor']:
             return Response(
@@ -380,11 +642,8 @@ class PatientDoctorMappingListCreateView(APIView):
 
         try:
             serializer = PatientDoctorMappingSerializer(data=request.data)
-            print(f"Serializer data: {serializer.initial_data}")
-            
+
             if serializer.is_valid():
-                print("Serializer is valid")
-                
                 if request.user.role == 'doctor':
                     try:
                         doctor_profile = Doctor.objects.get(user=request.user)
@@ -396,20 +655,36 @@ class PatientDoctorMappingListCreateView(APIView):
                         )
                 
                 instance = serializer.save()
-                print(f"Instance created: {instance}")
+                record_activity(request.user.id, 'mapping.created', 'patient', instance.patient_id, {
+                    'mapping_id': instance.id, 'doctor_id': instance.doctor_id,
+                })
+                logger.info("Mapping created", extra={
+                    'mapping_id': instance.id, 'patient_id': instance.patient_id,
+                    'doctor_id': instance.doctor_id, 'user_id': request.user.id,
+                })
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             else:
-                print(f"Serializer errors: {serializer.errors}")
+                logger.info("Mapping rejected", extra={'invalid_fields': sorted(serializer.errors)})
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+        except serializers.ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            print(f"Exception occurred: {str(e)}")
+            logger.exception("Mapping creation failed", extra={'user_id': request.user.id})
             return Response(
                 {"error": f"Server error: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
 
+class MappingExportView(StreamingExportView):
+    columns = MAPPING_EXPORT_COLUMNS
+    filename = 'mappings'
+
+    def get_queryset(self):
+        return PatientDoctorMapping.objects.order_by('id')
+
+
 class PatientDoctorMappingDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -441,6 +716,9 @@ class PatientDoctorMappingDetailView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
 
+        record_activity(request.user.id, 'mapping.deleted', 'patient', mapping.patient_id, {
+            'mapping_id': mapping.id, 'doctor_id': mapping.doctor_id,
+        })
         mapping.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -449,30 +727,79 @@ class DoctorSelfPatientsView(APIView):
     """Get all patients mapped to the current doctor"""
     permission_classes = [IsAuthenticated]
 
+    ORDERINGS = {
+        'name': ('patient__full_name', 'id'),
+        '-name': ('-patient__full_name', '-id'),
+        'mapped_at': ('created_at', 'id'),
+        '-mapped_at': ('-created_at', '-id'),
+    }
+    ROSTER_FIELDS = set(PatientSerializer.Meta.fields) | {'mapped_at'}
+
     def get(self, request):
         if request.user.role != 'doctor':
             return Response(
                 {"error": "Only doctors can access this endpoint"},
                 status=status.HTTP_403_FORBIDDEN
             )
-        
-        try:
-            doctor_profile = Doctor.objects.get(user=request.user)
-            mappings = PatientDoctorMapping.objects.filter(doctor=doctor_profile)
-            patients = [mapping.patient for mapping in mappings]
-            
-            serializer = PatientSerializer(patients, many=True)
-            return Response(serializer.data)
-        except Doctor.DoesNotExist:
+
+        ordering = request.query_params.get('ordering', 'name')
+        if ordering not in self.ORDERINGS:
             return Response(
-                {"error": "Doctor profile not found"},
-                status=status.HTTP_404_NOT_FOUND
+                {"error": f"ordering must be one of: {', '.join(self.ORDERINGS)}"},
+                status=status.HTTP_400_BAD_REQUEST
             )
 
+        fields = None
+        if request.query_params.get('fields'):
+            fields = [f.strip() for f in request.query_params['fields'].split(',') if f.strip()]
+            unknown = set(fields) - self.ROSTER_FIELDS
+            if unknown:
+                return Response(
+                    {"error": f"Unknown fields: {', '.join(sorted(unknown))}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        # Walk the roster from the mapping side so patient and user come
+        # back in the same joined query instead of one lookup per row. Only
+        # the columns of the requested fields are read.
+        profile_id = token_claim(request, 'profile_id')
+        if profile_id:
+            mappings = PatientDoctorMapping.objects.filter(doctor_id=profile_id, doctor__user=request.user)
+        else:
+            mappings = PatientDoctorMapping.objects.filter(doctor__user=request.user)
+        patients = PatientRowSerializer(fields=fields, prefix='patient__')
+
+        paginator = KeysetPagination(ordering=self.ORDERINGS[ordering])
+        ordering_paths = [field.lstrip('-') for field in paginator.ordering]
+        rows = patients.values(mappings, *ordering_paths, 'created_at')
+        page = paginator.paginate_queryset(rows, request, view=self)
+
+        if not page and not request.query_params.get(paginator.cursor_query_param):
+            if not Doctor.objects.filter(user=request.user).exists():
+                return Response(
+                    {"error": "Doctor profile not found"},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+
+        rows = patients.serialize(page)
+        if fields is None or 'mapped_at' in fields:
+            mapped_at = serializers.DateTimeField()
+            for row, mapping in zip(rows, page):
+                row['mapped_at'] = mapped_at.to_representation(mapping['created_at'])
+        return paginator.get_paginated_response(rows)
+
 
 class DoctorMapPatientView(APIView):
-    """Allow doctors to map patients to themselves"""
+    """
+    Allow doctors to map patients to themselves.
+
+    Accepts either a single ``patient_id`` or a list of ``patient_ids``
+    (up to MAX_BATCH). A batch is resolved with one lookup query and one
+    INSERT, and reports a status for every id: ``created``,
+    ``already_mapped`` or ``not_found``.
+    """
     permission_classes = [IsAuthenticated]
+    MAX_BATCH = 1000
 
     def post(self, request):
         if request.user.role != 'doctor':
@@ -481,46 +808,104 @@ class DoctorMapPatientView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        patient_id = request.data.get('patient_id')
-        if not patient_id:
+        patient_ids = request.data.get('patient_ids')
+        single = patient_ids is None
+        if single:
+            patient_id = request.data.get('patient_id')
+            if not patient_id:
+                return Response(
+                    {"error": "patient_id is required"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            patient_ids = [patient_id]
+
+        if not isinstance(patient_ids, list) or not patient_ids:
             return Response(
-                {"error": "patient_id is required"},
+                {"error": "patient_ids must be a non-empty list"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(patient_ids) > self.MAX_BATCH:
+            return Response(
+                {"error": f"At most {self.MAX_BATCH} patients can be mapped per request"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            # dict.fromkeys de-duplicates while keeping the caller's order.
+            patient_ids = list(dict.fromkeys(int(pid) for pid in patient_ids))
+        except (TypeError, ValueError):
+            return Response(
+                {"error": "patient ids must be integers"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
         try:
-            # Get the doctor profile
             doctor_profile = Doctor.objects.get(user=request.user)
-            
-            # Get the patient
-            patient = Patient.objects.get(id=patient_id)
-            
-            # Check if mapping already exists
-            if PatientDoctorMapping.objects.filter(patient=patient, doctor=doctor_profile).exists():
+        except Doctor.DoesNotExist:
+            return Response(
+                {"error": "Doctor profile not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        # Existence and current mapping state for every id in one query.
+        found = dict(
+            Patient.objects.filter(id__in=patient_ids).annotate(
+                already_mapped=Exists(PatientDoctorMapping.objects.filter(
+                    patient=OuterRef('pk'), doctor=doctor_profile
+                ))
+            ).values_list('id', 'already_mapped')
+        )
+        new_mappings = [
+            PatientDoctorMapping(patient_id=pid, doctor=doctor_profile)
+            for pid in patient_ids if pid in found and not found[pid]
+        ]
+
+        if single:
+            if not found:
+                return Response({"error": "Patient not found"}, status=status.HTTP_404_NOT_FOUND)
+            if not new_mappings:
                 return Response(
                     {"error": "This patient is already mapped to you"},
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            
-            # Create the mapping
-            mapping = PatientDoctorMapping.objects.create(
-                patient=patient,
-                doctor=doctor_profile
-            )
-            
+            mapping = new_mappings[0]
+            try:
+                with transaction.atomic():
+                    mapping.save()
+            except IntegrityError:
+                return Response(
+                    {"error": "This patient is already mapped to you"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            record_activity(request.user.id, 'mapping.created', 'patient', mapping.patient_id, {
+                'mapping_id': mapping.id, 'doctor_id': doctor_profile.id,
+            })
             serializer = PatientDoctorMappingSerializer(mapping)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        except Doctor.DoesNotExist:
-            return Response(
-                {"error": "Doctor profile not found"},
-                status=status.HTTP_404_NOT_FOUND
-            )
-        except Patient.DoesNotExist:
-            return Response(
-                {"error": "Patient not found"},
-                status=status.HTTP_404_NOT_FOUND
-            )
+        # ON CONFLICT DO NOTHING skips pairs a concurrent request mapped
+        # first; only the rows this INSERT returns count as created.
+        inserted = PatientDoctorMapping.objects.insert_missing(
+            doctor_profile.id, [mapping.patient_id for mapping in new_mappings]
+        )
+        for pid, mapping_id in inserted.items():
+            record_activity(request.user.id, 'mapping.created', 'patient', pid, {
+                'mapping_id': mapping_id, 'doctor_id': doctor_profile.id,
+            })
+
+        results = []
+        for pid in patient_ids:
+            if pid not in found:
+                result = 'not_found'
+            elif pid in inserted:
+                result = 'created'
+            else:
+                result = 'already_mapped'
+            results.append({'patient_id': pid, 'status': result})
+
+        return Response({
+            'created': len(inserted),
+            'results': results,
+        }, status=status.HTTP_201_CREATED if inserted else status.HTTP_200_OK)
 
 
 class PatientDoctorByPatientView(APIView):
@@ -535,9 +920,8 @@ class PatientDoctorByPatientView(APIView):
                     status=status.HTTP_403_FORBIDDEN
                 )
 
-            mappings = PatientDoctorMapping.objects.filter(patient_id=patient_id)
-            serializer = PatientDoctorMappingSerializer(mappings, many=True)
-            return Response(serializer.data)
+            mappings = mapping_queryset().filter(patient_id=patient_id)
+            return Response(PatientDoctorMappingRowSerializer().serialize(mappings))
 
         except Patient.DoesNotExist:
             return Response({"error": "Patient not found"}, status=status.HTTP_404_NOT_FOUND)
@@ -547,9 +931,8 @@ class UserListView(APIView):
     permission_classes = [IsAuthenticated, IsAdmin]
 
     def get(self, request):
-        users = CustomUser.objects.all()
-        serializer = UserSerializer(users, many=True)
-        return Response(serializer.data)
+        rows = UserRowSerializer()
+        return Response(rows.serialize(rows.values(CustomUser.objects.all())))
 
 
 class UserDetailView(APIView):
@@ -600,6 +983,15 @@ class ChangePasswordView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        # Same rules as registration, including SystemSettings.password_min_length
+        try:
+            validate_password(new_password, user)
+        except DjangoValidationError as exc:
+            return Response(
+                {"error": " ".join(exc.messages)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         # Set new password
         user.set_password(new_password)
         user.save()
@@ -617,65 +1009,110 @@ class SystemSettingsView(APIView):
     permission_classes = [IsAuthenticated, IsAdmin]
 
     def get(self, request):
-        # Return default system settings
-        # In a real application, you'd store these in the database
-        default_settings = {
-            'auto_logout': True,
-            'session_timeout': 60,
-            'email_notifications': True,
-            'data_retention': 365,
-            'max_login_attempts': 5,
-            'password_min_length': 8
-        }
-        return Response(default_settings)
+        return Response(dict(get_system_settings()))
 
     def put(self, request):
-        # Update system settings
-        # In a real application, you'd save these to the database
-        allowed_settings = [
-            'auto_logout', 'session_timeout', 'email_notifications', 
-            'data_retention', 'max_login_attempts', 'password_min_length'
-        ]
-        
-        updated_settings = {}
-        for setting in allowed_settings:
-            if setting in request.data:
-                updated_settings[setting] = request.data[setting]
+        # Partial update of the single row; unknown keys are ignored.
+        with transaction.atomic():
+            instance = (
+                SystemSettings.objects.select_for_update().filter(pk=SystemSettings.SINGLETON_ID).first()
+                or SystemSettings(pk=SystemSettings.SINGLETON_ID, **default_system_settings())
+            )
+            serializer = SystemSettingsSerializer(instance, data=request.data, partial=True)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            serializer.save(updated_by=request.user)
+            changes = dict(serializer.validated_data)
+            transaction.on_commit(
+                lambda: record_audit_event.delay('system_settings.updated', request.user.id, changes), robust=True
+            )
+            transaction.on_commit(
+                lambda: record_activity(request.user.id, 'system_settings.updated', details=changes)
+            )
 
-        # Here you would typically save to database
-        # For now, we'll just return the updated settings
         return Response({
             "message": "System settings updated successfully",
-            "settings": updated_settings
+            "settings": serializer.data
         }, status=status.HTTP_200_OK)
 
 
 class UserActivityView(APIView):
+    """
+    The activity log, newest first, one keyset page at a time.
+
+    Filters: ``user_id``, ``type`` (an action, may be repeated), and
+    ``since``/``until`` (ISO 8601). ``since`` defaults to seven days ago,
+    which also keeps the scan to the latest monthly partitions.
+    """
     permission_classes = [IsAuthenticated, IsAdmin]
+    DEFAULT_WINDOW = timedelta(days=7)
+
+    def parse_time(self, request, name):
+        value = request.query_params.get(name)
+        if value is None:
+            return None, None
+        try:
+            moment = parse_datetime(value)
+        except ValueError:
+            moment = None
+        if moment is None:
+            return None, f"{name} must be an ISO 8601 datetime"
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment, None
 
     def get(self, request):
-        # Get recent user activity
-        from django.db.models import Q
-        from datetime import datetime, timedelta
-        
-        # Get activities from last 7 days
-        week_ago = datetime.now() - timedelta(days=7)
-        
-        # You can extend this to track user activities in a separate model
-        # For now, return basic user login information
-        recent_users = CustomUser.objects.filter(
-            Q(last_login__gte=week_ago) | Q(date_joined__gte=week_ago)
-        ).order_by('-last_login', '-date_joined')[:10]
-        
-        activities = []
-        for user in recent_users:
-            activity = {
-                'user_id': user.id,
-                'username': user.username,
-                'activity': 'Logged in' if user.last_login else 'Registered',
-                'timestamp': user.last_login or user.date_joined,
-                'type': 'login' if user.last_login else 'registration'
-            }
-            activities.append(activity)
-        
-        return Response(activities, status=status.HTTP_200_OK)
+        since, error = self.parse_time(request, 'since')
+        if error is None:
+            until, error = self.parse_time(request, 'until')
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        events = ActivityEvent.objects.filter(occurred_at__gte=since or timezone.now() - self.DEFAULT_WINDOW)
+        if until is not None:
+            events = events.filter(occurred_at__lt=until)
+        user_id = request.query_params.get('user_id')
+        if user_id is not None:
+            try:
+                events = events.filter(user_id=int(user_id))
+            except ValueError:
+                return Response({"error": "user_id must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        actions = request.query_params.getlist('type')
+        if actions:
+            unknown = sorted(set(actions) - {action for action, _ in ActivityEvent.ACTION_CHOICES})
+            if unknown:
+                return Response(
+                    {"error": f"Unknown activity type: {', '.join(unknown)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            events = events.filter(action__in=actions)
+
+        rows = ActivityEventRowSerializer()
+        paginator = KeysetPagination(ordering=('-occurred_at', '-id'))
+        page = paginator.paginate_queryset(rows.values(events), request, view=self)
+        data = rows.serialize(page)
+        # Usernames come from a second, primary-key query rather than a
+        # join; events of deleted users keep a null username.
+        usernames = dict(
+            CustomUser.objects.filter(id__in={event['user_id'] for event in data}).values_list('id', 'username')
+        )
+        for event in data:
+            event['username'] = usernames.get(event['user_id'])
+        return paginator.get_paginated_response(data)
+
+
+class MetricsView(APIView):
+    """
+    Per-endpoint histograms of sampled request latency, SQL queries, DB
+    time and serializer time, plus Celery task counters. JSON by default,
+    Prometheus text with ``?format=prometheus``.
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, PrometheusRenderer]
+
+    def get(self, request):
+        return Response({
+            'sample_rate': settings.METRICS_SAMPLE_RATE,
+            'endpoints': request_metrics_report(),
+            'tasks': get_task_metrics(),
+        })
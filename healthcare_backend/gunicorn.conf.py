@@ -0,0 +1,55 @@
+"""
+Gunicorn configuration for production serving.
+
+    gunicorn -c gunicorn.conf.py
+
+SERVER_MODE=wsgi (default) serves healthcare_backend.wsgi with sync
+workers, or gthread workers when GUNICORN_THREADS > 1. SERVER_MODE=asgi
+serves healthcare_backend.asgi with uvicorn workers. Send SIGHUP to
+replace workers gracefully; with GUNICORN_PRELOAD on, code changes need a
+full restart because the application is imported once in the master.
+"""
+
+import multiprocessing
+import os
+
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi').lower()
+if SERVER_MODE not in ('wsgi', 'asgi'):
+    raise RuntimeError("SERVER_MODE must be 'wsgi' or 'asgi'")
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', '1'))
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'healthcare_backend.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'healthcare_backend.wsgi:application'
+    worker_class = 'gthread' if threads > 1 else 'sync'
+
+# Import Django once in the master so workers fork with it loaded.
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True').lower() == 'true'
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+# Keep-alive only matters behind a proxy that reuses upstream connections;
+# it must stay below the proxy's idle timeout.
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+
+# Recycle workers periodically, staggered so they do not restart together.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOGLEVEL', 'info')
+
+
+def post_fork(server, worker):
+    # Never share a database socket opened in the master during preload.
+    if not server.cfg.preload_app:
+        return
+    from django.db import connections
+
+    connections.close_all()
@@ -5,7 +5,10 @@ Django settings for healthcare_backend project.
 from pathlib import Path
 from datetime import timedelta
 import os
+import sys
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
+from kombu import Queue
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -17,6 +20,9 @@ SECRET_KEY = os.environ.get('SECRET_KEY', 'django-insecure-fallback-secret-key-f
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
 
+# True under `manage.py test`
+TESTING = 'test' in sys.argv[1:2]
+
 ALLOWED_HOSTS = ['127.0.0.1', 'localhost', 'backend', '0.0.0.0'] # For production, you might want to specify your domain
 
 # Application definition
@@ -34,8 +40,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.instrumentation.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'api.middleware.CompressionMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -88,27 +96,125 @@ WSGI_APPLICATION = 'healthcare_backend.wsgi.application'
 
 # Database
 # Use dj-database-url for production (Railway provides DATABASE_URL)
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': os.environ.get('DB_NAME', 'healthcare_db'),
-        'USER': os.environ.get('DB_USER', 'aditya'),
-        'PASSWORD': os.environ.get('DB_PASSWORD', 'aditya123'),
-        'HOST': os.environ.get('DB_HOST', 'db'),
-        'PORT': os.environ.get('DB_PORT', '5432'),
+if os.environ.get('DATABASE_URL'):
+    DATABASES = {
+        'default': dj_database_url.parse(os.environ['DATABASE_URL']),
     }
-}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'healthcare_db'),
+            'USER': os.environ.get('DB_USER', 'aditya'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', 'aditya123'),
+            'HOST': os.environ.get('DB_HOST', 'db'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+        }
+    }
+
+# Connection reuse. Opening a PostgreSQL connection (TCP + TLS + auth) costs
+# far more than a typical query, so by default connections are kept open
+# between requests.
+#   none        - new connection per request (Django's default behaviour)
+#   persistent  - keep connections for DB_CONN_MAX_AGE seconds, checking
+#                 they are still alive before reusing them
+#   pool        - psycopg3 connection pool (`psycopg[binary,pool]`)
+DB_POOL_MODE = os.environ.get('DB_POOL_MODE', 'persistent').lower()
+
+if DB_POOL_MODE == 'none':
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+elif DB_POOL_MODE == 'persistent':
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DB_CONN_MAX_AGE', '60'))
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+elif DB_POOL_MODE == 'pool':
+    # Pooled connections are returned to the pool at the end of each
+    # request, so persistent connections must be off.
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+        'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+        'timeout': int(os.environ.get('DB_POOL_TIMEOUT', '10')),
+    }
+else:
+    raise ImproperlyConfigured(
+        f"DB_POOL_MODE must be one of 'none', 'persistent' or 'pool', got {DB_POOL_MODE!r}"
+    )
+
+# Cache
+# Redis when REDIS_URL is set (shared by all workers), otherwise a
+# per-process in-memory cache so local development needs no Redis.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+            'KEY_PREFIX': 'healthcare',
+            'TIMEOUT': 300,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'healthcare',
+        }
+    }
+
+# Seconds a serialized approved-doctor directory stays cached. Writes bump
+# the directory version, so this only bounds memory, not staleness.
+DOCTOR_DIRECTORY_CACHE_TIMEOUT = int(os.environ.get('DOCTOR_DIRECTORY_CACHE_TIMEOUT', '3600'))
+
+# Largest file POST /api/v1/patients/import/ accepts. The import runs inside
+# the request, so it has to finish well within GUNICORN_TIMEOUT; larger
+# files go through `manage.py import_patients`.
+PATIENT_IMPORT_MAX_BYTES = int(os.environ.get('PATIENT_IMPORT_MAX_BYTES', str(2 * 1024 * 1024)))
 
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Client IPs for throttling come from REMOTE_ADDR unless the app runs
+    # behind this many trusted proxies that set X-Forwarded-For.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', '0')),
 }
 
+# Response compression (api.middleware.CompressionMiddleware): bodies below
+# COMPRESSION_MIN_SIZE bytes are sent uncompressed.
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '4'))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6'))
+# Responses that carry JWTs are never compressed: a compressed length that
+# depends on attacker-reflected input next to a secret leaks it (BREACH).
+COMPRESSION_EXCLUDED_URL_NAMES = ('register', 'login', 'token-refresh')
+
+# Request instrumentation (api.instrumentation): the fraction of requests
+# whose latency, queries, DB and serializer time are recorded (0 disables),
+# and how often each process publishes its histograms to the cache.
+METRICS_SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', '0.1'))
+METRICS_PUBLISH_INTERVAL = int(os.environ.get('METRICS_PUBLISH_INTERVAL', '15'))
+
+# Activity log (api.activity): events are queued in memory and written by
+# a background thread in batches of up to BATCH_SIZE, at most
+# FLUSH_INTERVAL seconds after they happen. Tests write them explicitly
+# with activity_recorder.flush().
+ACTIVITY_LOG_BATCH_SIZE = int(os.environ.get('ACTIVITY_LOG_BATCH_SIZE', '500'))
+ACTIVITY_LOG_FLUSH_INTERVAL = float(os.environ.get('ACTIVITY_LOG_FLUSH_INTERVAL', '1'))
+ACTIVITY_LOG_QUEUE_SIZE = int(os.environ.get('ACTIVITY_LOG_QUEUE_SIZE', '10000'))
+ACTIVITY_LOG_BACKGROUND = not TESTING
+
 # Custom user model
 AUTH_USER_MODEL = 'api.CustomUser'
 
@@ -118,7 +224,8 @@ AUTH_PASSWORD_VALIDATORS = [
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
     },
     {
-        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+        # Minimum length comes from SystemSettings.password_min_length.
+        'NAME': 'api.password_validation.MinimumLengthValidator',
     },
     {
         'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
@@ -128,6 +235,32 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing. PASSWORD_HASHER picks the hasher for new hashes; the
+# others stay listed so existing hashes still verify, and Django rehashes
+# them with the preferred hasher on the user's next successful login.
+PASSWORD_HASHER_CHOICES = {
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'bcrypt': 'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+}
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2').lower()
+if TESTING:
+    # The test suite hashes with MD5: fast, and never meant for real
+    # passwords, so PASSWORD_HASHER cannot select it.
+    PASSWORD_HASHERS = [
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+        *PASSWORD_HASHER_CHOICES.values(),
+    ]
+elif PASSWORD_HASHER in PASSWORD_HASHER_CHOICES:
+    PASSWORD_HASHERS = [PASSWORD_HASHER_CHOICES[PASSWORD_HASHER]] + [
+        hasher for name, hasher in PASSWORD_HASHER_CHOICES.items() if name != PASSWORD_HASHER
+    ]
+else:
+    raise ImproperlyConfigured(
+        f"PASSWORD_HASHER must be one of: {', '.join(PASSWORD_HASHER_CHOICES)}"
+    )
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -150,6 +283,66 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
     "ALGORITHM": "HS256",
     "AUTH_HEADER_TYPES": ("Bearer",),
+    # Applies the SystemSettings session_timeout/auto_logout policy.
+    "TOKEN_REFRESH_SERIALIZER": "api.authentication.HealthcareTokenRefreshSerializer",
+}
+
+# SystemSettings (api.system_settings) are served from a per-process copy
+# that is checked against the shared cache at most this often (seconds).
+SYSTEM_SETTINGS_CHECK_INTERVAL = int(os.environ.get('SYSTEM_SETTINGS_CHECK_INTERVAL', '5'))
+
+# Authenticated users are served from a per-process cache for this many
+# seconds instead of being loaded from the database on every request.
+AUTH_PRINCIPAL_CACHE_TTL = int(os.environ.get('AUTH_PRINCIPAL_CACHE_TTL', '30'))
+AUTH_PRINCIPAL_CACHE_SIZE = int(os.environ.get('AUTH_PRINCIPAL_CACHE_SIZE', '10000'))
+# How often (seconds) each process checks the shared cache for user
+# changes made by other processes.
+AUTH_PRINCIPAL_CACHE_CHECK_INTERVAL = int(os.environ.get('AUTH_PRINCIPAL_CACHE_CHECK_INTERVAL', '5'))
+
+# Serve the doctor directory, patient detail, mapping list and profile
+# GETs from the async views in api.async_views. Only worth it under ASGI
+# (SERVER_MODE=asgi); under WSGI each request would run its own event loop.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'False').lower() == 'true'
+
+# Celery. The broker defaults to the Redis used for caching; tasks are
+# routed to high/default/low queues so slow bulk work cannot delay
+# latency-sensitive notifications. Tests run tasks eagerly in-process.
+CELERY_BROKER_URL = os.environ.get(
+    'CELERY_BROKER_URL', os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+)
+CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', CELERY_BROKER_URL)
+CELERY_RESULT_EXPIRES = int(os.environ.get('CELERY_RESULT_EXPIRES', '86400'))
+CELERY_TASK_ALWAYS_EAGER = TESTING or os.environ.get('CELERY_TASK_ALWAYS_EAGER', 'False').lower() == 'true'
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_TASK_SERIALIZER = 'json'
+CELERY_RESULT_SERIALIZER = 'json'
+CELERY_ACCEPT_CONTENT = ['json']
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_QUEUES = (
+    Queue('high', routing_key='high'),
+    Queue('default', routing_key='default'),
+    Queue('low', routing_key='low'),
+)
+CELERY_TASK_ROUTES = {
+    'api.tasks.notify_admins_of_pending_doctor': {'queue': 'high'},
+    'api.tasks.send_email_batch': {'queue': 'default'},
+    'api.tasks.record_audit_event': {'queue': 'low'},
+}
+# Outgoing email tasks per worker, in Celery rate-limit syntax
+EMAIL_TASK_RATE_LIMIT = os.environ.get('EMAIL_TASK_RATE_LIMIT', '60/m')
+EMAIL_BATCH_SIZE = int(os.environ.get('EMAIL_BATCH_SIZE', '50'))
+
+# Login attempts allowed per window, counted in the shared cache.
+# EMAIL_MAX_FAILURES only applies until an admin sets
+# SystemSettings.max_login_attempts.
+LOGIN_THROTTLE = {
+    'EMAIL_MAX_FAILURES': int(os.environ.get('LOGIN_THROTTLE_EMAIL_MAX_FAILURES', '5')),
+    'IP_MAX_ATTEMPTS': int(os.environ.get('LOGIN_THROTTLE_IP_MAX_ATTEMPTS', '30')),
+    'WINDOW_SECONDS': int(os.environ.get('LOGIN_THROTTLE_WINDOW_SECONDS', '300')),
+    # Over-limit keys each process remembers in memory, at most.
+    'LOCAL_MAX_BLOCKED': int(os.environ.get('LOGIN_THROTTLE_LOCAL_MAX_BLOCKED', '10000')),
 }
 
 # Security settings for production
@@ -183,6 +376,24 @@ else:
     CORS_ALLOW_ALL_ORIGINS = True
 
 # Logging configuration
+
+# The api loggers write JSON lines through a background thread
+# (api.structured_logging). LOG_SAMPLE_RATES keeps that fraction of each
+# logger's records below WARNING, e.g. "api.views=0.1,api.audit=1".
+LOGGING_SAMPLE_RATES = {
+    name.strip(): float(rate)
+    for name, _, rate in (
+        item.partition('=') for item in os.environ.get('LOG_SAMPLE_RATES', 'api.views=0.1').split(',')
+    )
+    if name.strip()
+}
+# Values of these keys in log ``extra`` fields are replaced by [REDACTED].
+LOGGING_REDACT_FIELDS = [
+    'password', 'password2', 'old_password', 'new_password', 'token', 'access', 'refresh',
+    'authorization', 'secret', 'email', 'full_name', 'first_name', 'last_name', 'age', 'gender',
+    'contact_number', 'medical_history', 'license_number',
+]
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -201,6 +412,14 @@ LOGGING = {
             'class': 'logging.StreamHandler',
             'formatter': 'simple',
         },
+        'structured': {
+            # '()' rather than 'class': Python 3.12+ treats QueueHandler
+            # classes specially and would require a 'handlers' list.
+            '()': 'api.structured_logging.QueueingHandler',
+            'stream': 'ext://sys.stdout',
+            'sample_rates': LOGGING_SAMPLE_RATES,
+            'redact_fields': LOGGING_REDACT_FIELDS,
+        },
     },
     'root': {
         'handlers': ['console'],
@@ -212,5 +431,10 @@ LOGGING = {
             'level': os.getenv('DJANGO_LOG_LEVEL', 'INFO'),
             'propagate': False,
         },
+        'api': {
+            'handlers': ['structured'],
+            'level': os.getenv('API_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
     },
 }